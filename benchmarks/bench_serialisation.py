@@ -0,0 +1,47 @@
+"""
+Compare Metadata.to_dict with a traversal through the wrappers (as client code would otherwise do)
+
+    python benchmarks/bench_serialisation.py [path/to/metadata.xml] [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),'..'))
+from esri_metadata import Metadata
+from esri_metadata.wrappers.generic import Container,List
+from esri_metadata.wrappers.generic.values import TextScalarValue,AttributeScalarValue
+
+
+def wrapper_to_dict(w):
+    d={}
+    for name,schema in w.mapping.items():
+        child=getattr(w,name)
+        if isinstance(schema,(TextScalarValue,AttributeScalarValue)):
+            if child.is_present: d[name]=child.value
+        elif isinstance(schema,List):
+            if child.is_present: d[name]=[wrapper_item(item) for item in child]
+        elif child.is_present:
+            d[name]=wrapper_item(child)
+    return d
+
+def wrapper_item(w):
+    if set(w.mapping)=={'text'}:
+        return w.text.value
+    return wrapper_to_dict(w)
+
+
+def main(path,repeat):
+    md=Metadata(path)
+    # the sample documents' times aren't valid TimeValues
+    for name in ('CreaTime','ModTime'):
+        if getattr(md.Esri,name).is_present: delattr(md.Esri,name)
+    assert wrapper_to_dict(md)==md.to_dict()
+    for name,f in (('wrappers',lambda: wrapper_to_dict(md)),('to_dict',md.to_dict)):
+        t=min(timeit.repeat(f,number=repeat,repeat=3))/repeat
+        print('{:10} {:8.3f} ms'.format(name,t*1000))
+
+
+if __name__=='__main__':
+    main(sys.argv[1] if len(sys.argv)>1 else os.path.join(os.path.dirname(__file__),'..','tests','data','full_labelled.xml'),
+         int(sys.argv[2]) if len(sys.argv)>2 else 200)
@@ -0,0 +1,68 @@
+"""
+Generate synthetic ESRI metadata documents of a given size for benchmarking
+
+    python benchmarks/generate.py out.xml --contacts 100 --attrs 1000 --thumbnail 1000000
+"""
+import argparse
+import base64
+import os
+import random
+from xml.sax.saxutils import escape
+
+
+def contact(i,tag):
+    return (
+        '<{tag}><rpIndName>Contact{i} Name</rpIndName><rpOrgName>Contact{i} Organisation</rpOrgName>'
+        '<rpPosName>Contact{i} Position</rpPosName><role><RoleCd value="{role:03d}"/></role>'
+        '<rpCntInfo><cntAddress addressType="postal"><delPoint>{i} Street</delPoint><city>City{i}</city>'
+        '<postCode>{post:04d}</postCode><eMailAdd>contact{i}@example.com</eMailAdd><eMailAdd>other{i}@example.com</eMailAdd>'
+        '<country>AU</country></cntAddress><cntPhone><voiceNum>07 {i:04d} 5678</voiceNum></cntPhone></rpCntInfo></{tag}>'
+    ).format(tag=tag,i=i,role=i%11+1,post=4000+i%1000)
+
+def attr(i,domainValues):
+    edoms=''.join('<edom><edomv>{}</edomv><edomvd>Value {} of attribute {}</edomvd></edom>'.format(j,j,i) for j in range(domainValues))
+    return '<attr><attrlabl>FIELD_{}</attrlabl><attrdomv>{}</attrdomv></attr>'.format(i,edoms)
+
+
+def make_document(contacts=10,attrs=10,domainValues=3,thumbnail=0,seed=0):
+    """Return the xml (bytes) of a document with the given number of contacts (citRespParty), eainfo attributes (each
+    with domainValues coded values) and thumbnail size in bytes (before base64 encoding)."""
+    rnd=random.Random(seed)
+    parts=[
+        '<metadata xml:lang="en"><Esri><CreaDate>20160901</CreaDate><CreaTime>160805</CreaTime><ModDate>20160902</ModDate>'
+        '<ModTime>162242</ModTime><scaleRange><minScale>150000000</minScale><maxScale>5000</maxScale></scaleRange></Esri>',
+        '<dataIdInfo><idAbs>{}</idAbs><idCitation><resTitle>Synthetic Title</resTitle>'.format(escape('<DIV><P>Abstract</P></DIV>')),
+        ''.join(contact(i,'citRespParty') for i in range(contacts)),
+        '<date><createDate>2016-08-31T00:00:00</createDate><pubDate>2016-09-01T00:00:00</pubDate></date></idCitation>',
+        '<searchKeys>{}</searchKeys>'.format(''.join('<keyword>Keyword{}</keyword>'.format(i) for i in range(10))),
+        ''.join('<tpCat><TopicCatCd value="{:03d}"/></tpCat>'.format(i%19+1) for i in range(3)),
+        contact(contacts,'idPoC'),
+        '<resMaint>{}</resMaint></dataIdInfo>'.format(contact(contacts+1,'maintCont')),
+        '<eainfo><detailed Name="synthetic"><enttyp><enttypl>synthetic</enttypl></enttyp>',
+        ''.join(attr(i,domainValues) for i in range(attrs)),
+        '</detailed></eainfo>',
+        '<mdConst><SecConsts><class><ClasscationCd value="001"/></class><userNote>Note</userNote></SecConsts></mdConst>',
+    ]
+    if thumbnail:
+        data=bytearray(rnd.getrandbits(8) for i in range(thumbnail))
+        encoded=base64.encodestring(bytes(data)).decode('ascii')
+        parts.append('<Binary><Thumbnail><Data EsriPropertyType="PictureX">{}</Data></Thumbnail></Binary>'.format(encoded))
+    parts.append('<mdDateSt>20160902</mdDateSt></metadata>')
+    return ''.join(parts).encode('utf-8')
+
+def write_document(path,**kwargs):
+    with open(path,'wb') as fout:
+        fout.write(make_document(**kwargs))
+    return path
+
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--contacts',type=int,default=10)
+    parser.add_argument('--attrs',type=int,default=10)
+    parser.add_argument('--domain-values',type=int,default=3)
+    parser.add_argument('--thumbnail',type=int,default=0,help='bytes')
+    args=parser.parse_args()
+    write_document(args.path,contacts=args.contacts,attrs=args.attrs,domainValues=args.domain_values,thumbnail=args.thumbnail)
+    print('{} ({} bytes)'.format(args.path,os.path.getsize(args.path)))
@@ -0,0 +1,184 @@
+"""
+Benchmark the hot paths (load, navigate, iterate, parse, create, copy and save) on synthetic documents
+
+    python benchmarks/run.py [--sizes small,large] [--backend etree] [--history benchmarks/history.jsonl] [--threshold 1.25]
+
+Each result is appended as a line of JSON to the history file and compared with the last result for the same case,
+size, backend, python version and platform: anything slower by more than threshold is reported and the exit status is 1.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT=os.path.join(os.path.dirname(os.path.abspath(__file__)),'..')
+sys.path.insert(0,ROOT)
+from esri_metadata import Metadata
+
+from generate import write_document
+
+
+SIZES={
+    'small':dict(contacts=10,attrs=10),
+    'large':dict(contacts=200,attrs=2000,thumbnail=1<<20),
+}
+
+# the minimum time to run each case for (per repeat)
+MIN_TIME=0.2
+REPEAT=3
+
+
+# cases: each takes the path of a document and a backend name and returns the function to time
+def case_load(path,backend):
+    return lambda: Metadata(path,backend=backend)
+
+def case_navigate(path,backend):
+    md=Metadata(path,backend=backend)
+    return lambda: md.dataIdInfo.idCitation.citRespParty[-1].rpCntInfo.cntAddress.eMailAdd[0].text.value
+
+def case_list_iteration(path,backend):
+    md=Metadata(path,backend=backend)
+    def f():
+        for c in md.dataIdInfo.idCitation.citRespParty:
+            c.rpIndName.value
+        for a in md.eainfo.detailed[0].attr:
+            a.attrlabl.value
+    return f
+
+def case_parse_values(path,backend):
+    md=Metadata(path,backend=backend)
+    paths=[md.compile_path(p) for p in ('Esri/CreaDate','Esri/ModTime','Esri/scaleRange/minScale',
+                                        'dataIdInfo/idCitation/date/pubDate','dataIdInfo/idCitation/citRespParty[*]/rpCntInfo/cntAddress/postCode')]
+    def f():
+        # parse again rather than reading cached values
+        md.valueCache.clear()
+        for p in paths: p.get(md)
+    return f
+
+# every field of every contact: paths sharing a long prefix, read one at a time and then in one walk with read_many
+CONTACT_PATHS=['dataIdInfo/idCitation/citRespParty[*]/'+p for p in ('rpIndName','rpOrgName','rpPosName','role/RoleCd/value',
+    'rpCntInfo/cntAddress/addressType','rpCntInfo/cntAddress/delPoint','rpCntInfo/cntAddress/city',
+    'rpCntInfo/cntAddress/state','rpCntInfo/cntAddress/postCode','rpCntInfo/cntAddress/country',
+    'rpCntInfo/cntAddress/eMailAdd[*]')]
+
+def case_contact_fields(path,backend):
+    md=Metadata(path,backend=backend)
+    paths=[md.compile_path(p) for p in CONTACT_PATHS]
+    def f():
+        md.valueCache.clear()
+        for p in paths: p.get(md)
+    return f
+
+def case_contact_fields_read_many(path,backend):
+    md=Metadata(path,backend=backend)
+    pathSet=md.compile_paths(CONTACT_PATHS)
+    def f():
+        md.valueCache.clear()
+        md.read_many(pathSet)
+    return f
+
+def case_create_missing(path,backend):
+    md=Metadata(path,backend=backend)
+    def f():
+        md.dqInfo.dataLineage.statement.value='Statement'
+        del md.dqInfo
+    return f
+
+def case_set_copy(path,backend):
+    md=Metadata(path,backend=backend)
+    return lambda: md.dataIdInfo.idPoC.set(md.dataIdInfo.idCitation.citRespParty[0])
+
+def case_append_copy(path,backend):
+    md=Metadata(path,backend=backend)
+    attrs=md.eainfo.detailed[0].attr
+    def f():
+        attrs.append(attrs[0])
+        del attrs[-1]
+    return f
+
+def case_save(path,backend):
+    md=Metadata(path,backend=backend)
+    target=path+'.saved.xml'
+    return lambda: md.save_to_xml(target)
+
+CASES=[(n[5:],f) for n,f in sorted(globals().items()) if n.startswith('case_')]
+
+
+def measure(f):
+    """Return the best time for one call of f."""
+    number=1
+    while True:
+        t=timeit.timeit(f,number=number)
+        if t>=MIN_TIME: break
+        number*=2
+    return min([t]+timeit.repeat(f,number=number,repeat=REPEAT-1))/number
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git','rev-parse','--short','HEAD'],cwd=ROOT).decode('ascii').strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+def read_history(path):
+    """Return the last result for each (case,size,backend,python,platform) in the history file."""
+    last={}
+    if os.path.exists(path):
+        with open(path) as fin:
+            for line in fin:
+                if not line.strip(): continue
+                r=json.loads(line)
+                last[(r['case'],r['size'],r['backend'],r['python'],r['platform'])]=r
+    return last
+
+
+def main(args):
+    previous=read_history(args.history)
+    info={
+        'time':datetime.datetime.now().replace(microsecond=0).isoformat(),
+        'commit':git_commit(),
+        'python':platform.python_version(),
+        'platform':platform.platform(),
+        'backend':args.backend,
+    }
+    regressions=[]
+    tempDir=tempfile.mkdtemp(prefix='esri_metadata_bench_')
+    try:
+        with open(args.history,'a') as history:
+            for size in args.sizes.split(','):
+                path=write_document(os.path.join(tempDir,size+'.xml'),**SIZES[size])
+                for name,case in CASES:
+                    if args.cases and name not in args.cases.split(','): continue
+                    t=measure(case(path,args.backend))
+                    r=dict(info,case=name,size=size,seconds=t)
+                    history.write(json.dumps(r,sort_keys=True)+'\n')
+
+                    old=previous.get((name,size,args.backend,info['python'],info['platform']))
+                    change=''
+                    if old is not None:
+                        ratio=t/old['seconds']
+                        change='{:+.0%} vs {}'.format(ratio-1,old['commit'] or old['time'])
+                        if ratio>args.threshold: regressions.append((name,size,ratio))
+                    print('{:14} {:6} {:12.6f} ms  {}'.format(name,size,t*1000,change))
+    finally:
+        shutil.rmtree(tempDir,ignore_errors=True)
+
+    for name,size,ratio in regressions:
+        print('REGRESSION: {} ({}) is {:.2f}x slower'.format(name,size,ratio))
+    return 1 if regressions else 0
+
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes',default='small,large',help='any of: '+', '.join(sorted(SIZES)))
+    parser.add_argument('--cases',default='',help='comma separated, default all of: '+', '.join(n for n,f in CASES))
+    parser.add_argument('--backend',default='etree')
+    parser.add_argument('--history',default=os.path.join(os.path.dirname(os.path.abspath(__file__)),'history.jsonl'))
+    parser.add_argument('--threshold',type=float,default=1.25,help='the ratio to the previous result reported as a regression')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,299 @@
+"""
+EditPlan class
+"""
+from .Metadata import Metadata
+from .SchemaPath import SchemaPath,resolve,SEGMENT_RE,ONE,ALL
+from .wrappers.errors import InvalidPathError,InvalidStructureError,ReadOnlyError
+from .wrappers.generic import Container,List,Template
+from .wrappers.generic.values import TextScalarValue,AttributeScalarValue
+
+
+class PlanNode(object):
+    """The edits to make to one element of the tree (and, through children, below it)."""
+    def __init__(self):
+        # (tag,selector)->PlanNode
+        self.children={}
+        # ordered (step key,PlanNode) for applying in the order the edits were added
+        self.order=[]
+        self.actions=[]
+        # whether missing elements are created to reach this node (delete alone doesn't)
+        self.creates=False
+
+    def child(self,step):
+        node=self.children.get(step)
+        if node is None:
+            node=self.children[step]=PlanNode()
+            self.order.append((step,node))
+        return node
+
+
+class EditPlan(object):
+    """A set of edits compiled once against a schema (rootType, a Metadata by default) and then applied to any number
+    of documents, eg.
+
+        plan=EditPlan.from_dict({'Esri/scaleRange/minScale':150000000,'dataIdInfo/idCredit':'Credits'})
+        plan.set('dataIdInfo/idPoC',template.dataIdInfo.idPoC)
+        plan.replace('mdConst',template.mdConst)
+        for md in mds: plan.apply(md)
+
+    Edits are grouped by the elements they share, so applying them walks each document's tree once, creating missing
+    elements on the way (as the wrappers' create does). Plans can be pickled and called like a function, eg. as the
+    func of batch.process."""
+    def __init__(self,rootType=None):
+        self.rootType=Metadata if rootType is None else rootType
+        self.root=PlanNode()
+
+
+    @classmethod
+    def from_dict(cls,values,rootType=None):
+        """Return a plan setting each schema path in values (path->value) to its value."""
+        plan=cls(rootType)
+        for path,v in sorted(values.items()):
+            plan.set_value(path,v)
+        return plan
+
+    @classmethod
+    def from_metadata(cls,template,paths):
+        """Return a plan copying each of paths from the template document: values are set, elements are replaced and
+        Lists (paths ending in a List with no item selected) have all their items replaced. Paths the template has
+        nothing at (no value, element or items) are skipped. Value paths must select a single value, copy a List to copy
+        each of its items' values."""
+        plan=cls(template.__class__)
+        for path in paths:
+            steps,w=resolve(plan.rootType,path)
+            if is_value_path(plan.rootType,path):
+                if any(selector==ALL for tag,selector in steps):
+                    raise InvalidPathError('Can only copy a single value, not [*]: {}'.format(path))
+                v=template.get(path)
+                if v is not None: plan.set_value(path,v)
+            else:
+                source=wrapper_at(template,path)
+                if source is None or source.is_missing: continue
+                if isinstance(w,List) and not path.rstrip('/').endswith(']'):
+                    plan.replace(path,list(source))
+                else:
+                    plan.set(path,source)
+        return plan
+
+
+    def set_value(self,path,value):
+        """Set the value at a schema path (None removes the text or attribute). [*] sets every existing item."""
+        p=SchemaPath.compile(self.rootType,path)
+        text=None if value is None else p.valueWrapper.format_value(value)
+        if isinstance(p.valueWrapper,AttributeScalarValue):
+            action=('attribute',p.valueWrapper.name,text)
+        else:
+            action=('text',text)
+        self.add(p.steps,action,True)
+
+    def set(self,path,source):
+        """Replace the element at a schema path with a copy of source (an element wrapper or a Template)."""
+        steps,w=self.resolve_element(path)
+        if isinstance(w,List):
+            if not path.rstrip('/').endswith(']'):
+                raise InvalidPathError('{} is a List, select an item with [i] (or use replace) in path: {}'.format(w.name,path))
+            self.check_type(w,source)
+        elif not isinstance(w,Container):
+            raise InvalidPathError('Path does not end in an element: {}'.format(path))
+        tag,selector=steps[-1]
+        if selector==ALL:
+            raise InvalidPathError('Can only set one element: {}'.format(path))
+        self.add(steps[:-1],('set',tag,selector,as_template(source)),True)
+
+    def append(self,path,source):
+        """Append a copy of source (an element wrapper or a Template) to the List at a schema path."""
+        steps,w=self.resolve_list(path)
+        self.check_type(w,source)
+        self.add(steps,('append',w.name,as_template(source)),True)
+
+    def replace(self,path,sources):
+        """Replace the items of the List at a schema path with copies of sources."""
+        steps,w=self.resolve_list(path)
+        templates=[]
+        for source in sources:
+            self.check_type(w,source)
+            templates.append(as_template(source))
+        self.add(steps,('replace',w.name,templates),True)
+
+    def delete(self,path):
+        """Delete the element at a schema path, or all the items of a List."""
+        steps,w=self.resolve_element(path)
+        if isinstance(w,List) and not path.rstrip('/').endswith(']'):
+            self.add(steps,('replace',w.name,[]),False)
+        else:
+            tag,selector=steps[-1]
+            self.add(steps[:-1],('delete',tag,selector),False)
+
+
+    def resolve_element(self,path):
+        steps,w=resolve(self.rootType,path)
+        if isinstance(w,(TextScalarValue,AttributeScalarValue)):
+            raise InvalidPathError('Path ends in a value: {}'.format(path))
+        return steps,w
+
+    def resolve_list(self,path):
+        steps,w=self.resolve_element(path)
+        if not isinstance(w,List) or path.rstrip('/').endswith(']'):
+            raise InvalidPathError('Path does not end in a List: {}'.format(path))
+        return steps,w
+
+    def check_type(self,w,source):
+        itemType=source.wrapperType if isinstance(source,Template) else source.__class__
+        if not issubclass(itemType,w.itemType): raise TypeError('Cannot assign {} where {} is expected'.format(itemType.__name__,w.itemType.__name__))
+
+    def add(self,steps,action,creates):
+        node=self.root
+        node.creates=node.creates or creates
+        for step in steps:
+            node=node.child(step)
+            node.creates=node.creates or creates
+        node.actions.append(action)
+
+
+    def apply(self,md):
+        """Make the edits to md, a bound instance of rootType."""
+        if md.shared: raise ReadOnlyError('Cannot modify a shared Metadata, modify a copy instead')
+        if md.element is None:
+            raise InvalidStructureError('The root element is not {}'.format(md.name))
+        self.apply_node(md,md.element,self.root,'')
+
+    __call__=apply
+
+    def apply_node(self,md,element,node,path):
+        """Make node's edits to element, whose (concrete) schema path is path: changes are recorded under the paths of
+        the elements and values they modify, as the wrappers record them."""
+        for action in node.actions:
+            getattr(self,'apply_'+action[0])(md,element,path,*action[1:])
+        for (tag,selector),child in node.order:
+            children=md.childIndex.find(element,tag)
+            if selector is ONE:
+                if len(children)>1:
+                    raise InvalidStructureError('Multiple elements found when expecting one: {}'.format(tag))
+                if not children:
+                    if not child.creates: continue
+                    children=(self.create_element(md,element,tag,join(path,tag)),)
+            elif selector==ALL:
+                pass
+            elif -len(children)<=selector<len(children):
+                children=(children[selector],)
+            elif child.creates:
+                raise IndexError('{} has no item {}'.format(join(path,tag),selector))
+            else:
+                continue
+            count=len(md.childIndex.find(element,tag))
+            for i,e in enumerate(children):
+                if selector is ONE:
+                    childPath=join(path,tag)
+                else:
+                    # items are recorded by their (non-negative) index, as the wrappers record them
+                    childPath=item_path(path,tag,i if selector==ALL else selector%count)
+                self.apply_node(md,e,child,childPath)
+
+    def create_element(self,md,parent,tag,path):
+        e=md.backend.sub_element(parent,tag)
+        md.childIndex.add(parent,e)
+        md.valueCache.pop(parent,None)
+        md.mark_changed(path)
+        return e
+
+
+    def apply_text(self,md,element,path,text):
+        if element.text==text and len(element)==0 and element not in md.binaryPayloads: return
+        element.text=text
+        for e in list(element):
+            element.remove(e)
+        md.childIndex.invalidate(element)
+        md.valueCache.pop(element,None)
+        md.binaryPayloads.pop(element,None)
+        md.mark_changed(path)
+
+    def apply_attribute(self,md,element,path,name,text):
+        if element.get(name)==text: return
+        if text is None:
+            element.attrib.pop(name,None)
+        else:
+            element.set(name,text)
+        md.valueCache.pop(element,None)
+        md.mark_changed(join(path,name))
+
+    def apply_set(self,md,element,path,tag,selector,template):
+        e=template.build(md.backend)
+        e.tag=tag
+        children=md.childIndex.find(element,tag)
+        if selector is not ONE:
+            if not -len(children)<=selector<len(children):
+                raise IndexError('{} has no item {}'.format(tag,selector))
+            old=children[selector]
+            element.insert(list(element).index(old),e)
+            self.remove(md,element,old)
+            md.mark_changed(item_path(path,tag,selector%len(children)))
+        else:
+            for old in children: self.remove(md,element,old)
+            element.append(e)
+            md.mark_changed(join(path,tag))
+        md.childIndex.invalidate(element)
+
+    def apply_append(self,md,element,path,tag,template):
+        e=template.build(md.backend)
+        e.tag=tag
+        element.append(e)
+        md.childIndex.add(element,e)
+        md.valueCache.pop(element,None)
+        md.mark_changed(item_path(path,tag,len(md.childIndex.find(element,tag))-1))
+
+    def apply_replace(self,md,element,path,tag,templates):
+        old=md.childIndex.find(element,tag)
+        if not old and not templates: return
+        for e in old:
+            self.remove(md,element,e)
+        for template in templates:
+            self.apply_append(md,element,path,tag,template)
+        md.mark_changed(join(path,tag))
+
+    def apply_delete(self,md,element,path,tag,selector):
+        children=md.childIndex.find(element,tag)
+        if selector is not ONE:
+            if not -len(children)<=selector<len(children): return
+            old=children[selector]
+            self.remove(md,element,old)
+            md.mark_changed(item_path(path,tag,selector%len(children)))
+            return
+        for old in children:
+            self.remove(md,element,old)
+            md.mark_changed(join(path,tag))
+
+    def remove(self,md,parent,e):
+        parent.remove(e)
+        md.childIndex.remove(parent,e)
+        md.valueCache.pop(parent,None)
+
+
+def join(path,segment):
+    return path+'/'+segment if path else segment
+
+def item_path(path,tag,i):
+    return join(path,'{}[{}]'.format(tag,i))
+
+def is_value_path(rootType,path):
+    try:
+        SchemaPath.compile(rootType,path)
+    except InvalidPathError:
+        return False
+    return True
+
+def as_template(source):
+    return source if isinstance(source,Template) else Template(source)
+
+def wrapper_at(md,path):
+    """Return the bound wrapper at a schema path of md (None if there's no such List item)."""
+    w=md
+    for segment in path.strip('/').split('/'):
+        name,selector=SEGMENT_RE.match(segment).groups()
+        w=getattr(w,name)
+        if selector==ALL:
+            raise InvalidPathError('Can only copy from one element, not [*]: {}'.format(path))
+        if selector is not None:
+            i=int(selector)
+            if not -len(w)<=i<len(w): return None
+            w=w[i]
+    return w
@@ -1,20 +1,85 @@
 """
 Metadata class
 """
+import io
+import mmap
 import os
+import shutil
 import tempfile
-
-import xml.etree.ElementTree as ET
+import threading
 
 from .wrappers.errors import *
 from .wrappers.generic import *
 from .wrappers.generic.values import *
+from .wrappers.generic.values.BinaryValues import file_validators
+from .SchemaPath import SchemaPath,PathSet,parse_paths
+from .bridge import ArcpyBridge
+from .backends import get_backend,PARSE_ERRORS
+from .executors import Executors,FILE,GEODATABASE
+from .validation import validate
+from . import serialisation
+from . import instrumentation
+
+
+# the thumbnail's text is left in the source file when loading, see Metadata.load_from_xml
+THUMBNAIL_PATH='Binary/Thumbnail/Data'
+THUMBNAIL_TAGS=tuple(t.encode('ascii') for t in THUMBNAIL_PATH.split('/'))
+PAYLOAD_MARKER='esri_metadata-binary-payload'
+FEED_SIZE=1<<16
+
+# errors loading one document: a malformed or unreadable (or changed, see SourceChangedError) file
+LOAD_ERRORS=(InvalidStructureError,EnvironmentError)+PARSE_ERRORS
+
+
+def locate_element_text(data,tags):
+    """Return the (start,end) byte offsets of the text of the element found by searching for each of tags in turn (eg.
+    the first Data after the first Thumbnail after the first Binary), or None if it can't be found or isn't plain text."""
+    i=0
+    for tag in tags:
+        while True:
+            i=data.find(b'<'+tag,i)
+            if i<0: return None
+            i+=len(tag)+1
+            c=data[i:i+1]
+            if c and c in b'> \t\r\n': break
+    start=data.find(b'>',i)
+    if start<0 or data[start-1:start]==b'/': return None
+    start+=1
+    end=data.find(b'</'+tags[-1]+b'>',start)
+    if end<0 or data.find(b'<',start,end)>=0 or data.find(b'&',start,end)>=0: return None
+    return start,end
+
+
+def is_xml_path(path):
+    """Whether path is (or can be saved as) an xml file rather than a geodatabase dataset."""
+    return os.path.isfile(path) or (os.path.isdir(os.path.dirname(path)) and path.endswith('.xml'))
+
+
+def read_umask():
+    # the umask can only be read by setting it, which affects every thread, so it's only done once (on import)
+    mask=os.umask(0)
+    os.umask(mask)
+    return mask
+
+UMASK=read_umask()
+
+def replace_file(src,dst):
+    """Replace dst with src (a temporary file), giving src dst's mode or, for a new file, that of a file created with
+    the umask the process had on import."""
+    if os.path.exists(dst):
+        shutil.copymode(dst,src)
+        if os.name=='nt': os.remove(dst)
+    else:
+        os.chmod(src,0o666&~UMASK)
+    os.rename(src,dst)
 
 
 # ========================================
 # Specific Classes
 # ========================================
 class DateTriple(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'pubDate':TextDateTimeValueContainer(),
@@ -24,6 +89,8 @@ class DateTriple(Container):
 
 
 class Keywords(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'keyword':List(TextStringValueContainer),
@@ -31,6 +98,8 @@ class Keywords(Container):
         }
 
 class ThesaName(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'resTitle':TextStringValueContainer(),
@@ -43,6 +112,8 @@ class ThesaName(Container):
         }
 
 class TpCat(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'TopicCatCd':Container({'value':AttributeStringValue(),}),
@@ -53,6 +124,8 @@ class TpCat(Container):
 # Contact Classes
 # ========================================
 class Contact(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'displayName':TextStringValueContainer(), # similar to rpIndName but not always populated
@@ -79,6 +152,8 @@ class Contact(Container):
 
 
 class PrcStep(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'stepDesc':TextStringValueContainer(),
@@ -91,18 +166,24 @@ class PrcStep(Container):
 # Constraints Classes
 # ========================================
 class Consts(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'useLimit':List(TextStringValueContainer),
         }
 
 class RestrictCd(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'RestrictCd':Container({'value':AttributeStringValue(),}),
         }
 
 class LegConsts(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'accessConsts':List(RestrictCd),
@@ -112,6 +193,8 @@ class LegConsts(Container):
         }
 
 class SecConsts(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'useLimit':List(TextStringValueContainer),
@@ -122,6 +205,8 @@ class SecConsts(Container):
         }
 
 class Const(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'SecConsts':SecConsts(),
@@ -134,6 +219,8 @@ class Const(Container):
 
 
 class AggrInfo(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'aggrDSIdent':AggrDsIdent(),
@@ -141,6 +228,8 @@ class AggrInfo(Container):
         }
 
 class AggrDsIdent(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'identCode':TextStringValueContainer(),
@@ -148,12 +237,16 @@ class AggrDsIdent(Container):
 
 
 class SpatRpType(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'SpatRepTypCd':Container({'value':AttributeStringValue(),}), # value: 001=Vector, 002=Grid
         }
 
 class Report(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'type':AttributeStringValue(), # DQNonQuanAttAcc: Quan or Qual?
@@ -165,6 +258,8 @@ class Report(Container):
 
 
 class AxisDimension(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'type':AttributeStringValue(), # 001=Row-y, 002=Column-x
@@ -174,6 +269,8 @@ class AxisDimension(Container):
 
 
 class GridSpatRep(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'numDims':TextIntegerValueContainer(),
@@ -182,6 +279,8 @@ class GridSpatRep(Container):
         }
 
 class Georect(Container):
+    __slots__=()
+
     def get_children(self):
         # this is different to GridSpatRep in some of the fields that haven't been fleshed out here
         return {
@@ -192,6 +291,8 @@ class Georect(Container):
 
 
 class SpatRepInfo(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'GridSpatRep':GridSpatRep(),
@@ -203,6 +304,8 @@ class SpatRepInfo(Container):
 
 # Fields
 class Detailed(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'Name':AttributeStringValue(),
@@ -215,6 +318,8 @@ class Detailed(Container):
         }
 
 class Attr(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'attrlabl':TextStringValueContainer(),
@@ -222,6 +327,8 @@ class Attr(Container):
         }
 
 class Attrdomv(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'edom':List(Edom),
@@ -237,6 +344,8 @@ class Attrdomv(Container):
         }
 
 class Edom(Container):
+    __slots__=()
+
     def get_children(self):
         return {
             'edomv':TextStringValueContainer(),
@@ -250,12 +359,49 @@ class Edom(Container):
 # Base Metadata Class
 # ========================================
 class Metadata(Container):
-    def __init__(self,datasetPath):
-        self.datasetPath=datasetPath
+    # the GeodatabaseBridge used for datasets that aren't xml files when none is given, an ArcpyBridge unless replaced
+    defaultBridge=None
+    # the ParseCache used for xml files when none is given, None for no caching
+    defaultParseCache=None
+    # the Executors aload/asave run in when none are given, created on first use
+    defaultExecutors=None
+    # set per instance (the wrappers' backend property reads it from their document)
+    backend=None
+    # a shared document (see cache.MetadataCache) can't be modified
+    shared=False
+    # the MetadataCache a copy is saved through
+    metadataCache=None
+    # counts of what this document has done (an instrumentation.Stats), while instrumentation is enabled
+    stats=None
+    # whether the thumbnail of an xml file is left in the file until used, see load_from_xml
+    lazyBinary=False
+
+    def __init__(self,datasetPath,paths=None,bridge=None,backend=None,parseCache=None,lazyBinary=False):
+        """If paths (schema paths, see compile_path) are given, only the parts of the document needed to read them are
+        loaded: everything else is discarded while parsing and the Metadata can't be saved.
+
+        bridge (a GeodatabaseBridge) is used to export/import datasets that aren't xml files, see get_bridge.
+
+        backend is the element tree implementation, 'etree' or 'lxml' (or a backend instance), see backends.
+
+        parseCache (a cache.ParseCache) keeps xml files in a pre-parsed form so that they're only parsed again once
+        changed.
+
+        lazyBinary leaves the thumbnail of an xml file in the file until it's used, see load_from_xml."""
+        self.prepare(datasetPath,paths,bridge,backend,parseCache)
+        self.lazyBinary=lazyBinary
         self.load(datasetPath)
-        self.set_name('metadata')
-        self.bind()
+
+    def prepare(self,datasetPath,paths,bridge,backend,parseCache):
         super(Metadata,self).__init__()
+        self.set_name('metadata')
+        self.datasetPath=datasetPath
+        self.paths=None if paths is None else [p if isinstance(p,SchemaPath) else self.compile_path(p) for p in paths]
+        self.bridge=bridge
+        self.backend=get_backend(backend)
+        self.parseCache=parseCache if parseCache is not None else Metadata.defaultParseCache
+        # held while wrappers add elements, so that views of the same element don't each create it
+        self.writeLock=threading.RLock()
 
 
     def get_children(self):
@@ -307,7 +453,7 @@ class Metadata(Container):
             }),
             'Binary':Container({
                 'Thumbnail':Container({
-                    'Data':TextStringValueContainer(),
+                    'Data':TextBinaryValueContainer(),
                 }),
             }),
             'mdFileID':TextStringValueContainer(),
@@ -316,35 +462,308 @@ class Metadata(Container):
         }
 
 
+    @classmethod
+    def get_bridge(cls,bridge=None):
+        if bridge is not None: return bridge
+        if Metadata.defaultBridge is None: Metadata.defaultBridge=ArcpyBridge()
+        return Metadata.defaultBridge
+
+    @classmethod
+    def get_executors(cls,executors=None):
+        if executors is not None: return executors
+        if Metadata.defaultExecutors is None: Metadata.defaultExecutors=Executors()
+        return Metadata.defaultExecutors
+
+    @classmethod
+    def aload(cls,datasetPath,paths=None,bridge=None,backend=None,parseCache=None,executors=None,lazyBinary=False):
+        """Load datasetPath in a thread (see executors), returning a concurrent.futures Future of the Metadata."""
+        kind=FILE if os.path.isfile(datasetPath) else GEODATABASE
+        return cls.get_executors(executors).submit(kind,cls,datasetPath,paths,bridge,backend,parseCache,lazyBinary)
+
+    def asave(self,path=None,force=False,executors=None):
+        """Save in a thread (see executors), returning a concurrent.futures Future of whether it was written. The document
+        shouldn't be modified until it's done."""
+        kind=FILE if is_xml_path(self.datasetPath if path is None else path) else GEODATABASE
+        return self.get_executors(executors).submit(kind,self.save,path,force)
+
+
     def load(self,path):
         if os.path.isfile(path):
-            tmpPath=path
+            self.load_file(path)
         else:
-            with tempfile.NamedTemporaryFile(mode='w',suffix='.xml',delete=False) as fout:
-                fout.write('<metadata />')
-                tmpPath=fout.name
-            import arcpy
-            arcpy.MetadataImporter_conversion(path,tmpPath)
-        self.load_from_xml(tmpPath)
+            bridge=self.get_bridge(self.bridge)
+            xmlPaths=bridge.export_metadata([path])
+            try:
+                self.load_from_xml(xmlPaths[0],lazyBinary=False)
+            finally:
+                bridge.release(xmlPaths)
+
+    @classmethod
+    def load_many(cls,datasetPaths,paths=None,bridge=None,backend=None,parseCache=None,lazyBinary=False,onError=None):
+        """Return a Metadata for each of datasetPaths, the datasets that aren't xml files are exported in one call to the
+        bridge. A document that can't be loaded (one of LOAD_ERRORS) raises, unless onError is given: it's then called
+        with the dataset path and the error and the document is left out."""
+        datasetPaths=list(datasetPaths)
+        bridge=cls.get_bridge(bridge)
+        gdbPaths=[p for p in datasetPaths if not os.path.isfile(p)]
+        xmlPaths=dict(zip(gdbPaths,bridge.export_metadata(gdbPaths))) if gdbPaths else {}
+        try:
+            mds=[]
+            for p in datasetPaths:
+                md=cls.__new__(cls)
+                md.prepare(p,paths,bridge,backend,parseCache)
+                md.lazyBinary=lazyBinary
+                try:
+                    if p in xmlPaths:
+                        md.load_from_xml(xmlPaths[p],lazyBinary=False)
+                    else:
+                        md.load_file(p)
+                except LOAD_ERRORS as e:
+                    if onError is None: raise
+                    onError(p,e)
+                    continue
+                mds.append(md)
+            return mds
+        finally:
+            bridge.release(xmlPaths.values())
+
+    def load_file(self,path):
+        """Load the xml file at path through the parse cache, if any. A partial load (see paths) can use a cached tree but
+        doesn't add one."""
+        if self.parseCache is not None and self.parseCache.load(self,path): return
+        store=self.parseCache is not None and self.paths is None
+        # taken before parsing, a tree parsed from a file that then changes is stored as stale
+        validators=self.parseCache.validators(path) if store else None
+        self.load_from_xml(path,self.lazyBinary)
+        if store: self.parseCache.store(self,path,validators)
+
+    def load_from_xml(self,path,lazyBinary=False):
+        """Load the xml file at path. With lazyBinary the (base64) thumbnail is not parsed but left in the file and only
+        read when it's used: the file must then stay in place, unchanged, for the life of this Metadata (using the
+        thumbnail after the file has changed raises SourceChangedError, saving over the file itself is fine)."""
+        with instrumentation.timer('xml_parse',self):
+            self.parse_xml(path,lazyBinary)
+
+    def parse_xml(self,path,lazyBinary):
+        if self.paths is not None:
+            self.set_tree(parse_paths(path,self.paths,self.name,self.backend))
+            return
+
+        span=None
+        if lazyBinary and os.path.getsize(path)>0:
+            with open(path,'rb') as fin:
+                # taken before reading, a payload is only used while the file is as it was parsed
+                validators=file_validators(path)
+                data=mmap.mmap(fin.fileno(),0,access=mmap.ACCESS_READ)
+                try:
+                    span=locate_element_text(data,THUMBNAIL_TAGS)
+                    if span is not None:
+                        # parse everything around the thumbnail's text, leaving a marker in its place
+                        parser=self.backend.parser()
+                        for i in range(0,span[0],FEED_SIZE): parser.feed(data[i:min(i+FEED_SIZE,span[0])])
+                        parser.feed(PAYLOAD_MARKER)
+                        for i in range(span[1],len(data),FEED_SIZE): parser.feed(data[i:i+FEED_SIZE])
+                        tree=self.backend.element_tree(parser.close())
+                finally:
+                    data.close()
+        if span is None:
+            self.set_tree(self.backend.parse(path))
+            return
+
+        self.set_tree(tree)
+        try:
+            elements=self.compile_path(THUMBNAIL_PATH).find_elements(tree.getroot(),self.childIndex)
+        except InvalidStructureError:
+            elements=[]
+        if tree.getroot().tag==self.name and len(elements)==1 and elements[0].text==PAYLOAD_MARKER:
+            elements[0].text=None
+            self.binaryPayloads[elements[0]]=BinaryPayload(path,span[0],span[1]-span[0],validators)
+        else:
+            # the text found wasn't the thumbnail's
+            self.set_tree(self.backend.parse(path))
+
+    def set_tree(self,tree):
+        self.tree=tree
+        self.childIndex=ChildIndex(self)
+        # element->BinaryPayload for binary values that are left in the source file
+        self.binaryPayloads={}
+        # schema paths modified since loading
+        self.changes=set()
+        # element->{key:(raw value,parsed value)}, see TextScalarValue.read_value
+        self.valueCache={}
+        self.bind()
 
-    def load_from_xml(self,path):
-        self.tree=ET.parse(path)
 
+    @property
+    def is_read_only(self):
+        return self.paths is not None or self.shared
 
-    def save(self,path=None):
-        if path is None: path=self.datasetPath
-        if os.path.isfile(path) or (os.path.isdir(os.path.dirname(path)) and path.endswith('.xml')):
-            tmpPath=path
-        else:
-            with tempfile.NamedTemporaryFile(mode='w',suffix='.xml',delete=False) as fout:
-                tmpPath=fout.name
-        self.save_to_xml(tmpPath)
-        if not os.path.isfile(path):
-            import arcpy
-            arcpy.MetadataImporter_conversion(tmpPath,path)
+    def copy(self):
+        """Return an independent copy of this document, which can be modified even if this one is shared."""
+        md=self.__class__.__new__(self.__class__)
+        md.prepare(self.datasetPath,self.paths,self.bridge,self.backend,self.parseCache)
+        root=self.tree.getroot()
+        copied=self.backend.copy(root)
+        md.set_tree(self.backend.element_tree(copied))
+        if self.binaryPayloads:
+            for e,c in zip(root.iter(),copied.iter()):
+                payload=self.binaryPayloads.get(e)
+                if payload is not None: md.binaryPayloads[c]=payload
+        md.changes=set(self.changes)
+        return md
+
+
+    def mark_changed(self,path):
+        self.changes.add(path)
+
+    @property
+    def is_changed(self):
+        """Whether the document has been modified since it was loaded or last saved to datasetPath."""
+        return bool(self.changes)
+
+    @property
+    def changed_paths(self):
+        """The schema paths modified since the document was loaded or last saved to datasetPath."""
+        return sorted(self.changes)
+
+
+    def save(self,path=None,force=False):
+        """Save to path (default: datasetPath) and return whether it was written: saving to datasetPath is skipped if
+        nothing has changed (unless force)."""
+        return self.save_many([self],None if path is None else [path],self.bridge,force)[0]
+
+    @classmethod
+    def save_many(cls,mds,datasetPaths=None,bridge=None,force=False):
+        """Save each of mds (to its datasetPath, or the matching one of datasetPaths), the datasets that aren't xml files
+        are imported in one call to the bridge. Returns whether each was written, see save."""
+        if datasetPaths is None: datasetPaths=[md.datasetPath for md in mds]
+        bridge=cls.get_bridge(bridge)
+        written=[]
+        items=[]
+        try:
+            for md,path in zip(mds,datasetPaths):
+                if md.is_read_only: raise ReadOnlyError('Cannot save a partially loaded or shared Metadata')
+                if not force and not md.is_changed and path==md.datasetPath:
+                    written.append(False)
+                    continue
+                if is_xml_path(path):
+                    md.save_to_xml(path)
+                else:
+                    items.append((bridge.scratch_path(),path))
+                    md.save_to_xml(items[-1][0])
+                written.append(True)
+            if items: bridge.import_metadata(items)
+        finally:
+            bridge.release(xmlPath for xmlPath,path in items)
+        for md,path,w in zip(mds,datasetPaths,written):
+            if w and path==md.datasetPath:
+                md.changes.clear()
+                if md.metadataCache is not None: md.metadataCache.saved(md)
+        return written
 
     def save_to_xml(self,path):
-        self.tree.write(path)
+        if self.is_read_only: raise ReadOnlyError('Cannot save a partially loaded or shared Metadata')
+        with instrumentation.timer('xml_write',self):
+            self.write_xml(path)
+
+    def write_xml(self,path):
+        if not self.binaryPayloads:
+            self.backend.write(self.tree,path)
+            return
+
+        # write everything else with markers in place of the payloads, then copy the payloads into place
+        markers=[]
+        texts={}
+        for i,(e,payload) in enumerate(self.binaryPayloads.items()):
+            texts[e]='{}-{}'.format(PAYLOAD_MARKER,i)
+            markers.append((texts[e].encode('ascii'),e,payload))
+        buf=io.BytesIO()
+        # the markers go in a copy, the document may be being read (eg. shared through a MetadataCache)
+        self.backend.write(self.backend.with_texts(self.tree,texts),buf)
+        skeleton=buf.getvalue()
+
+        # the payloads may be in path itself, so write to a new file and replace path with it once done
+        fd,tmpPath=tempfile.mkstemp(suffix='.xml',dir=os.path.dirname(os.path.abspath(path)))
+        moved=[]
+        try:
+            with os.fdopen(fd,'wb') as fout:
+                pos=0
+                for i,marker,e,payload in sorted((skeleton.find(m),m,e,p) for m,e,p in markers):
+                    # a missing marker means the element is no longer in the tree
+                    if i<0: continue
+                    fout.write(skeleton[pos:i])
+                    offset=fout.tell()
+                    for c in payload.chunks(): fout.write(c)
+                    pos=i+len(marker)
+                    moved.append((e,offset,payload))
+                fout.write(skeleton[pos:])
+                if instrumentation.enabled: instrumentation.count('temp_bytes',fout.tell(),self)
+            replace_file(tmpPath,path)
+        except:
+            if os.path.exists(tmpPath): os.remove(tmpPath)
+            raise
+        # payloads in the file just written now point into it
+        payloads={}
+        for e,offset,payload in moved:
+            samePath=os.path.abspath(payload.path)==os.path.abspath(path)
+            payloads[e]=BinaryPayload(path,offset,payload.length) if samePath else payload
+        self.binaryPayloads=payloads
+
+    def validate(self):
+        """Check the whole document at once, returning a ValidationReport of every value that can't be parsed and every
+        element repeated where only one is expected."""
+        return validate(self)
+
+    def to_dict(self,skipBinary=False):
+        """Return the document as a dict of (typed) values, following the schema, see serialisation."""
+        return serialisation.to_dict(self,skipBinary=skipBinary)
+
+    def to_json(self,fileobj,skipBinary=False,indent=None):
+        """Write the document to fileobj as JSON, see serialisation."""
+        serialisation.to_json(self,fileobj,skipBinary,indent)
+
+    @classmethod
+    def from_dict(cls,d,datasetPath=None,backend=None):
+        """Return a new document built from a dict as returned by to_dict (or loaded from to_json's JSON). It's saved to
+        datasetPath, if given."""
+        md=cls.__new__(cls)
+        md.prepare(datasetPath,None,None,backend,None)
+        md.set_tree(md.backend.element_tree(serialisation.from_dict(d,md.compile_children(),md.name,md.backend)))
+        for name in d: md.mark_changed(name)
+        return md
+
+    def xpath(self,expr):
+        """Evaluate an XPath expression (compiled once per backend) relative to the root element. Only a subset of XPath
+        is supported by the etree backend."""
+        return self.backend.xpath(expr)(self.tree.getroot())
+
+    def write_thumbnail(self,fileobj):
+        """Write the (decoded) thumbnail image to fileobj, it is streamed from the source file when possible."""
+        self.Binary.Thumbnail.Data.text.write_to(fileobj)
+
+
+    @classmethod
+    def compile_path(cls,path):
+        """Compile a schema path (eg. 'dataIdInfo/idCitation/citRespParty[*]/rpIndName') for reading from many
+        documents, see SchemaPath."""
+        return SchemaPath.compile(cls,path)
+
+    def get(self,path):
+        """Read the value at a schema path, eg. md.get('dataIdInfo/idCitation/resTitle')."""
+        return SchemaPath.compile(self.__class__,path).get(self)
+
+    @classmethod
+    def compile_paths(cls,paths):
+        """Compile schema paths to be read together from many documents, see PathSet and read_many."""
+        return PathSet.compile(cls,paths)
+
+    def read_many(self,paths):
+        """Read the values at many schema paths (or a PathSet) in one walk of the tree, returning ({path:value},
+        {path:error}). A value that can't be read is None (or [] for a path with [*]) and its error (InvalidValueError or
+        InvalidStructureError) is returned in errors rather than raised."""
+        pathSet=paths if isinstance(paths,PathSet) else PathSet.compile(self.__class__,paths)
+        values,errors=pathSet.read(self.element,self)
+        return dict(zip(pathSet.keys,values)),errors
 
 
     def bind(self):
@@ -352,9 +771,13 @@ class Metadata(Container):
         root=self.tree.getroot()
         self.element=root if root.tag==self.name else None
         self.parentElementWrapper=self
+        self.document=self
 
 
     # add references to exceptions here for easier error handling in client code
     InvalidValueError=InvalidValueError
     InvalidStructureError=InvalidStructureError
     UnboundElementError=UnboundElementError
+    InvalidPathError=InvalidPathError
+    ReadOnlyError=ReadOnlyError
+    SourceChangedError=SourceChangedError
@@ -0,0 +1,301 @@
+"""
+SchemaPath class
+"""
+import collections
+import re
+import threading
+
+from .wrappers.errors import InvalidPathError,InvalidStructureError,InvalidValueError
+from .wrappers.generic import Container,List
+from .wrappers.generic.values import TextScalarValue,AttributeScalarValue
+
+
+SEGMENT_RE=re.compile(r'^([^\[\]/]+)(?:\[(\*|-?\d+)\])?$')
+
+# step selectors
+ONE=None
+ALL='*'
+
+
+class LruCache(object):
+    """A thread safe mapping holding at most maxEntries items, dropping the least recently used."""
+    def __init__(self,maxEntries):
+        self.maxEntries=maxEntries
+        self.entries=collections.OrderedDict()
+        self.lock=threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self,key):
+        return key in self.entries
+
+    def get_or_add(self,key,create):
+        """Return the item for key, adding create() if there isn't one."""
+        with self.lock:
+            v=self.entries.pop(key,None)
+            if v is not None:
+                # re-insert as the most recently used
+                self.entries[key]=v
+                return v
+        v=create()
+        with self.lock:
+            v=self.entries.setdefault(key,v)
+            while len(self.entries)>self.maxEntries:
+                self.entries.popitem(last=False)
+        return v
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def scan_children(element,tag):
+    return [e for e in element if e.tag==tag]
+
+def compile_path(rootType,path):
+    return SchemaPath.compile(rootType,path)
+
+
+def resolve(rootType,path):
+    """Follow path through rootType's schema, returning the (tag,selector) steps to the element it ends at and the schema
+    wrapper it ends at. A path ending in a List with no item selected stops at the List's parent element, a path ending
+    in a value stops at the element holding it."""
+    steps=[]
+    w=None
+    mapping=rootType.compile_children()
+    segments=path.strip('/').split('/')
+    for i,segment in enumerate(segments):
+        m=SEGMENT_RE.match(segment)
+        if m is None:
+            raise InvalidPathError('Invalid segment "{}" in path: {}'.format(segment,path))
+        if mapping is None:
+            raise InvalidPathError('Path continues past a value: {}'.format(path))
+        name,selector=m.groups()
+        w=mapping.get(name)
+        if w is None:
+            raise InvalidPathError('{} not found in path: {}'.format(name,path))
+
+        if isinstance(w,List):
+            if selector is None:
+                if i<len(segments)-1:
+                    raise InvalidPathError('{} is a List, select items with [i] or [*] in path: {}'.format(name,path))
+                break
+            steps.append((name,selector if selector==ALL else int(selector)))
+            mapping=w.itemType.compile_children()
+        elif selector is not None:
+            raise InvalidPathError('{} is not a List in path: {}'.format(name,path))
+        elif isinstance(w,Container):
+            steps.append((name,ONE))
+            mapping=w.mapping
+        elif isinstance(w,(TextScalarValue,AttributeScalarValue)):
+            mapping=None
+        else:
+            raise InvalidPathError('{} ({}) can not be read in path: {}'.format(name,w.__class__.__name__,path))
+    return steps,w
+
+
+class SchemaPath(object):
+    """A path through a Container's schema compiled once and then read directly from the element tree of any number of
+    documents, without creating the intermediate wrappers.
+
+    Segments are separated by '/'. List items are selected with [i] or [*] (all items), eg.
+    'dataIdInfo/idCitation/citRespParty[*]/rpCntInfo/cntAddress/eMailAdd[*]'. A path must end in a value; when it ends in
+    a text container (eg. 'dataIdInfo/idCitation/resTitle') its text value is used.
+
+    A path containing [*] reads as a list of the values present, otherwise as a single value (None when missing)."""
+    # (rootType,path)->SchemaPath, bounded as paths may be built on the fly (eg. with indices)
+    compiled=LruCache(1024)
+
+    @classmethod
+    def compile(cls,rootType,path):
+        """Return the (shared) compiled path for rootType."""
+        return cls.compiled.get_or_add((rootType,path),lambda: cls(rootType,path))
+
+
+    def __init__(self,rootType,path):
+        self.rootType=rootType
+        self.path=path
+        # (tag,selector) for each element hop, selector is ONE, ALL or a list index; and the schema wrapper for the value,
+        # used to parse it
+        self.steps,w=resolve(rootType,path)
+        self.many=any(selector==ALL for tag,selector in self.steps)
+
+        if isinstance(w,List) and not path.rstrip('/').endswith(']'):
+            raise InvalidPathError('{} is a List, select items with [i] or [*] in path: {}'.format(w.name,path))
+        if not isinstance(w,(TextScalarValue,AttributeScalarValue)):
+            # allow paths to stop at a text container
+            mapping=w.itemType.compile_children() if isinstance(w,List) else w.mapping
+            w=mapping.get('text')
+            if not isinstance(w,TextScalarValue):
+                raise InvalidPathError('Path does not end in a value: {}'.format(path))
+        self.valueWrapper=w
+
+
+    def __repr__(self):
+        return '{}({}, {!r})'.format(self.__class__.__name__,self.rootType.__name__,self.path)
+
+    def __reduce__(self):
+        # compiled paths refer to the shared schema, so recompile (once per process) instead of pickling it
+        return (compile_path,(self.rootType,self.path))
+
+
+    def find_elements(self,element,childIndex=None):
+        """Return the elements holding the value(s), starting from element (the element of the root Container)."""
+        find=scan_children if childIndex is None else childIndex.find
+        elements=[element]
+        for tag,selector in self.steps:
+            found=[]
+            for e in elements:
+                children=find(e,tag)
+                if selector is ONE:
+                    if len(children)>1:
+                        raise InvalidStructureError('Multiple elements found when expecting one: {}'.format(tag))
+                    found.extend(children)
+                elif selector==ALL:
+                    found.extend(children)
+                elif -len(children)<=selector<len(children):
+                    found.append(children[selector])
+            if not found:
+                return found
+            elements=found
+        return elements
+
+
+    def read(self,element,document=None):
+        """Read the value(s) from the tree under element, which belongs to document (if given)."""
+        childIndex=None if document is None else document.childIndex
+        elements=self.find_elements(element,childIndex) if element is not None else []
+        values=[self.valueWrapper.read_value(e,document) for e in elements]
+        if self.many:
+            return values
+        return values[0] if values else None
+
+    def get(self,document):
+        """Read the value(s) from document, a bound instance of rootType (eg. a Metadata)."""
+        return self.read(document.element,document)
+
+    __call__=get
+
+
+class PathNode(object):
+    """The paths read from one set of elements of the tree (and, through children, below it)."""
+    def __init__(self):
+        # (index,SchemaPath) of the paths whose values are held by these elements
+        self.fields=[]
+        # (tag,selector)->PathNode
+        self.children={}
+        # every path ending at or below this node
+        self.paths=[]
+
+
+class PathSet(object):
+    """Schema paths merged into a trie, so that reading all of them walks the tree once, see Metadata.read_many. The
+    elements shared by several paths (eg. dataIdInfo/idCitation) are found once."""
+    # (rootType,paths)->PathSet
+    compiled=LruCache(128)
+
+    @classmethod
+    def compile(cls,rootType,paths):
+        """Return the (shared) compiled set of paths for rootType."""
+        paths=tuple(paths)
+        return cls.compiled.get_or_add((rootType,paths),lambda: cls(rootType,paths))
+
+
+    def __init__(self,rootType,paths):
+        self.rootType=rootType
+        self.paths=[p if isinstance(p,SchemaPath) else SchemaPath.compile(rootType,p) for p in paths]
+        self.keys=[p.path for p in self.paths]
+        self.root=PathNode()
+        for i,p in enumerate(self.paths):
+            node=self.root
+            node.paths.append(p)
+            for step in p.steps:
+                child=node.children.get(step)
+                if child is None: child=node.children[step]=PathNode()
+                node=child
+                node.paths.append(p)
+            node.fields.append((i,p))
+
+    def __repr__(self):
+        return '{}({}, {} paths)'.format(self.__class__.__name__,self.rootType.__name__,len(self.paths))
+
+    def __len__(self):
+        return len(self.paths)
+
+
+    def read(self,element,document=None):
+        """Read the value(s) of every path from the tree under element (see SchemaPath.read), returning (values,errors):
+        the values in the order of the paths and {path:error} for those that couldn't be read (whose value is left as
+        None, or [] for paths with [*])."""
+        values=[[] if p.many else None for p in self.paths]
+        errors={}
+        if element is not None:
+            find=scan_children if document is None else document.childIndex.find
+            self.read_node(self.root,[element],find,document,values,errors)
+        return values,errors
+
+    def read_node(self,node,elements,find,document,values,errors):
+        for i,p in node.fields:
+            try:
+                v=[p.valueWrapper.read_value(e,document) for e in elements]
+            except (InvalidValueError,InvalidStructureError) as e:
+                errors[p.path]=e
+                continue
+            values[i]=v if p.many else v[0]
+        for (tag,selector),child in node.children.items():
+            found=[]
+            for e in elements:
+                children=find(e,tag)
+                if selector is ONE:
+                    if len(children)>1: break
+                    found.extend(children)
+                elif selector==ALL:
+                    found.extend(children)
+                elif -len(children)<=selector<len(children):
+                    found.append(children[selector])
+            else:
+                if found: self.read_node(child,found,find,document,values,errors)
+                continue
+            error=InvalidStructureError('Multiple elements found when expecting one: {}'.format(tag))
+            for p in child.paths: errors[p.path]=error
+
+
+# marks a subtree that is kept whole
+KEEP=object()
+
+def parse_paths(source,paths,rootTag,backend):
+    """Parse the xml in source keeping only the elements needed to read paths, every other element is discarded as soon
+    as it has been parsed so that memory use doesn't grow with the size of the document."""
+    trie={}
+    for p in paths:
+        if not p.steps:
+            trie=KEEP
+            break
+        node=trie
+        for tag,selector in p.steps[:-1]:
+            node=node.setdefault(tag,{})
+            if node is KEEP: break
+        else:
+            node[p.steps[-1][0]]=KEEP
+
+    root=None
+    # (element, trie node) for each open element, a node of None means the element is being discarded
+    stack=[]
+    for event,e in backend.iterparse(source,('start','end')):
+        if event=='start':
+            if root is None:
+                root=e
+                node=trie if e.tag==rootTag else None
+            else:
+                node=stack[-1][1]
+                if node is not KEEP and node is not None:
+                    node=node.get(e.tag)
+            stack.append((e,node))
+        else:
+            e,node=stack.pop()
+            if node is None:
+                e.clear()
+                # detach it straight away, even from a discarded parent, which may have many more children to parse
+                if stack: stack[-1][0].remove(e)
+    return backend.element_tree(root)
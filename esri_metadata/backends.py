@@ -0,0 +1,185 @@
+"""
+Element tree backends: the standard library's ElementTree or lxml, used interchangeably behind the wrappers
+
+    md=Metadata('path/to/metadata.xml',backend='lxml')
+    # or for every Metadata
+    backends.set_default_backend('lxml')
+"""
+import copy
+import threading
+import xml.etree.ElementTree as ET
+
+
+# what parsing malformed xml raises: ElementTree's ParseError and lxml's XMLSyntaxError are both SyntaxErrors
+PARSE_ERRORS=(SyntaxError,)
+
+
+class ElementTreeBackend(object):
+    """xml.etree.ElementTree"""
+    name='etree'
+
+    def __init__(self):
+        self.compiledXPaths={}
+        self.lock=threading.Lock()
+
+
+    def parse(self,source):
+        return ET.parse(source)
+
+    def parser(self):
+        """Return a parser to feed() and close()."""
+        return ET.XMLParser()
+
+    def iterparse(self,source,events):
+        return ET.iterparse(source,events=events)
+
+    def element_tree(self,root):
+        return ET.ElementTree(root)
+
+
+    def is_element(self,element):
+        return isinstance(element,ET.Element)
+
+    def element(self,tag,attrib={}):
+        return ET.Element(tag,attrib)
+
+    def sub_element(self,parent,tag,attrib={}):
+        return ET.SubElement(parent,tag,attrib)
+
+    def copy(self,element):
+        """Return a deep copy of element (which may come from a document using another backend)."""
+        if self.is_element(element):
+            return copy.deepcopy(element)
+        return ET.fromstring(to_string(element))
+
+    def with_texts(self,tree,texts):
+        """Return a tree to write in place of tree with the text of some of its elements (texts, element->text)
+        replaced, leaving tree itself untouched (it may be read meanwhile). Only the elements on the way to those in texts
+        are copied, the rest are shared."""
+        parents={}
+        for p in tree.getroot().iter():
+            for c in p: parents[c]=p
+        copies={}
+        def copy_of(e):
+            c=copies.get(e)
+            if c is None:
+                c=copies[e]=ET.Element(e.tag,e.attrib)
+                c.text=e.text
+                c.tail=e.tail
+                c[:]=list(e)
+                p=parents.get(e)
+                if p is not None:
+                    pc=copy_of(p)
+                    pc[list(p).index(e)]=c
+            return c
+        for e,text in texts.items():
+            copy_of(e).text=text
+        return ET.ElementTree(copies.get(tree.getroot(),tree.getroot()))
+
+
+    def write(self,tree,target):
+        """Write tree to target (a path or file object)."""
+        tree.write(target)
+
+
+    def xpath(self,expr):
+        """Return a (cached) function that evaluates expr relative to an element, returning a list."""
+        f=self.compiledXPaths.get(expr)
+        if f is None:
+            f=self.compile_xpath(expr)
+            with self.lock:
+                self.compiledXPaths[expr]=f
+        return f
+
+    def compile_xpath(self,expr):
+        # ElementTree only supports a subset of XPath
+        return lambda element: element.findall(expr)
+
+
+class LxmlBackend(ElementTreeBackend):
+    """lxml.etree (an optional dependency): a faster parser with support for huge trees (text nodes over 10MB, eg.
+    thumbnails) and compiled XPath. Documents are written whole, with the declaration, comments, processing instructions
+    and doctype they were read with."""
+    name='lxml'
+
+    def __init__(self,hugeTree=True):
+        super(LxmlBackend,self).__init__()
+        from lxml import etree
+        self.etree=etree
+        self.hugeTree=hugeTree
+
+
+    def parse(self,source):
+        return self.etree.parse(source,self.parser())
+
+    def parser(self):
+        return self.etree.XMLParser(huge_tree=self.hugeTree)
+
+    def iterparse(self,source,events):
+        return self.etree.iterparse(source,events=events,huge_tree=self.hugeTree)
+
+    def element_tree(self,root):
+        return self.etree.ElementTree(root)
+
+
+    def is_element(self,element):
+        return isinstance(element,self.etree._Element)
+
+    def element(self,tag,attrib={}):
+        return self.etree.Element(tag,attrib)
+
+    def sub_element(self,parent,tag,attrib={}):
+        return self.etree.SubElement(parent,tag,attrib)
+
+    def copy(self,element):
+        if self.is_element(element):
+            return copy.deepcopy(element)
+        return self.etree.fromstring(to_string(element))
+
+    def with_texts(self,tree,texts):
+        # an lxml element belongs to one parent, so the whole tree is copied
+        copied=copy.deepcopy(tree)
+        for e,c in zip(tree.getroot().iter(),copied.getroot().iter()):
+            text=texts.get(e)
+            if text is not None: c.text=text
+        return copied
+
+
+    def write(self,tree,target):
+        tree.write(target,encoding=tree.docinfo.encoding or 'UTF-8',xml_declaration=True)
+
+
+    def compile_xpath(self,expr):
+        return self.etree.XPath(expr)
+
+
+def to_string(element):
+    """Serialise an element from any backend."""
+    if isinstance(element,ET.Element):
+        return ET.tostring(element)
+    from lxml import etree
+    return etree.tostring(element)
+
+
+BACKENDS={
+    ElementTreeBackend.name:ElementTreeBackend,
+    LxmlBackend.name:LxmlBackend,
+}
+instances={}
+defaultBackend=None
+
+def get_backend(backend=None):
+    """Return a backend instance given an instance, a name ('etree' or 'lxml') or None for the default."""
+    if backend is None:
+        backend=defaultBackend or ElementTreeBackend.name
+    if isinstance(backend,ElementTreeBackend):
+        return backend
+    b=instances.get(backend)
+    if b is None:
+        b=instances.setdefault(backend,BACKENDS[backend]())
+    return b
+
+def set_default_backend(backend):
+    """Set the backend (an instance or name) used by Metadata when none is given."""
+    global defaultBackend
+    defaultBackend=get_backend(backend)
@@ -0,0 +1,103 @@
+"""
+Process many metadata documents across a pool of worker processes
+
+    def stamp(md):
+        md.Esri.scaleRange.minScale.value=150000000
+        return md.get('dataIdInfo/idCitation/resTitle')
+
+    for r in batch.process(paths,stamp,save=True,chunkSize=20,ordered=False):
+        print(r.datasetPath,r.value if r.ok else r.error)
+
+func is run in the workers so, as with anything passed to a process pool, it and the value it returns must be picklable
+(ie. func must be a module level function).
+"""
+import collections
+import itertools
+import multiprocessing
+
+from .Metadata import Metadata,LOAD_ERRORS
+from .wrappers.errors import InvalidValueError
+
+
+# errors that are captured against the item instead of stopping the batch: invalid values and documents that can't be
+# loaded or saved
+ITEM_ERRORS=(InvalidValueError,)+LOAD_ERRORS
+
+
+class Result(object):
+    """The outcome for one dataset: value is what func returned or error is the exception it raised. saved is whether
+    the document was written (unchanged documents aren't)."""
+    def __init__(self,datasetPath,value=None,error=None,saved=False):
+        self.datasetPath=datasetPath
+        self.value=value
+        self.error=error
+        self.saved=saved
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return 'Result({!r}, {})'.format(self.datasetPath,'value={!r}'.format(self.value) if self.ok else 'error={!r}'.format(self.error))
+
+
+def process_one(datasetPath,func,save,schemaPaths):
+    try:
+        md=Metadata(datasetPath,paths=schemaPaths)
+        value=func(md)
+        saved=md.save() if save else False
+    except ITEM_ERRORS as e:
+        return Result(datasetPath,error=e)
+    return Result(datasetPath,value,saved=saved)
+
+def process_chunk(datasetPaths,func,save,schemaPaths):
+    return [process_one(p,func,save,schemaPaths) for p in datasetPaths]
+
+
+def chunked(iterable,size):
+    it=iter(iterable)
+    while True:
+        chunk=list(itertools.islice(it,size))
+        if not chunk: return
+        yield chunk
+
+
+def process(datasetPaths,func,save=False,workers=None,chunkSize=1,ordered=True,progress=None,schemaPaths=None):
+    """Load each of datasetPaths as a Metadata, call func(md) and (if save) save it, yielding a Result for each.
+
+    workers is the number of processes (default: one per cpu), 0 runs everything in this process. Paths are sent to the
+    workers chunkSize at a time and only a few chunks per worker are queued, so datasetPaths can be a lazy iterable of any
+    size. Results come back in the order of datasetPaths if ordered, otherwise as soon as they're done. progress, if
+    given, is called with the number of results so far and the latest Result. schemaPaths loads the documents read only
+    (see Metadata)."""
+    if workers==0:
+        results=(r for chunk in chunked(datasetPaths,chunkSize) for r in process_chunk(chunk,func,save,schemaPaths))
+    else:
+        results=process_in_pool(datasetPaths,func,save,workers or multiprocessing.cpu_count(),chunkSize,ordered,schemaPaths)
+    for n,r in enumerate(results,1):
+        if progress is not None: progress(n,r)
+        yield r
+
+
+def process_in_pool(datasetPaths,func,save,workers,chunkSize,ordered,schemaPaths):
+    # requires the futures backport on python 2
+    from concurrent.futures import ProcessPoolExecutor,wait,FIRST_COMPLETED
+
+    maxPending=workers*2
+    with ProcessPoolExecutor(workers) as executor:
+        pending=collections.deque()
+        def completed():
+            """Return the results of the next finished chunk(s) (the oldest one if ordered)."""
+            if ordered:
+                return pending.popleft().result()
+            done,notDone=wait(pending,return_when=FIRST_COMPLETED)
+            pending.clear()
+            pending.extend(notDone)
+            return [r for f in done for r in f.result()]
+
+        for chunk in chunked(datasetPaths,chunkSize):
+            pending.append(executor.submit(process_chunk,chunk,func,save,schemaPaths))
+            while len(pending)>=maxPending:
+                for r in completed(): yield r
+        while pending:
+            for r in completed(): yield r
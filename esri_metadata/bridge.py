@@ -0,0 +1,128 @@
+"""
+Bridges that move metadata between geodatabase datasets and the xml files Metadata works on
+"""
+import atexit
+import itertools
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from . import instrumentation
+
+
+class GeodatabaseBridge(object):
+    """Exports/imports the metadata of (non xml file) datasets through xml files in a scratch directory.
+
+    Work is done in batches: export_metadata and import_metadata take any number of datasets per call, so that per call
+    overhead is paid once. The scratch directory is created on first use and reused; if it was created by the bridge it
+    is removed by close() (or at exit).
+
+    Subclasses implement export_to and import_from."""
+    def __init__(self,scratchDir=None):
+        self.scratchDir=scratchDir
+        self.ownsScratchDir=False
+        self.counter=itertools.count()
+        self.lock=threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+
+    def scratch_path(self):
+        """Return a new, unique xml path in the scratch directory."""
+        with self.lock:
+            if self.scratchDir is None:
+                self.scratchDir=tempfile.mkdtemp(prefix='esri_metadata_')
+                self.ownsScratchDir=True
+                atexit.register(self.close)
+            n=next(self.counter)
+        if instrumentation.enabled: instrumentation.count('scratch_files')
+        return os.path.join(self.scratchDir,'{}_{}.xml'.format(os.getpid(),n))
+
+    def release(self,xmlPaths):
+        """Delete scratch files once they have been loaded/imported."""
+        for p in xmlPaths:
+            if os.path.exists(p): os.remove(p)
+
+    def close(self):
+        if self.ownsScratchDir and self.scratchDir is not None:
+            shutil.rmtree(self.scratchDir,ignore_errors=True)
+            self.scratchDir=None
+            self.ownsScratchDir=False
+
+
+    def export_metadata(self,datasetPaths):
+        """Export the metadata of each of datasetPaths to a scratch xml file, returning the xml paths (in the same order).
+        The caller should release them when done."""
+        xmlPaths=[self.scratch_path() for p in datasetPaths]
+        try:
+            with instrumentation.timer('bridge_export'):
+                self.export_to(list(zip(datasetPaths,xmlPaths)))
+        except:
+            self.release(xmlPaths)
+            raise
+        return xmlPaths
+
+    def import_metadata(self,items):
+        """Import each (xmlPath,datasetPath) of items into the dataset."""
+        with instrumentation.timer('bridge_import'):
+            self.import_from(list(items))
+
+
+    def export_to(self,pairs):
+        """Export the metadata of each (datasetPath,xmlPath) in pairs to the xml file."""
+        raise NotImplementedError()
+
+    def import_from(self,pairs):
+        """Import each (xmlPath,datasetPath) in pairs into the dataset."""
+        raise NotImplementedError()
+
+
+class ArcpyBridge(GeodatabaseBridge):
+    """Uses arcpy's MetadataImporter tool, arcpy is imported (once) on first use."""
+    def export_to(self,pairs):
+        import arcpy
+        for datasetPath,xmlPath in pairs:
+            with open(xmlPath,'w') as fout:
+                fout.write('<metadata />')
+            with instrumentation.timer('arcpy_export'):
+                arcpy.MetadataImporter_conversion(datasetPath,xmlPath)
+
+    def import_from(self,pairs):
+        import arcpy
+        for xmlPath,datasetPath in pairs:
+            with instrumentation.timer('arcpy_import'):
+                arcpy.MetadataImporter_conversion(xmlPath,datasetPath)
+
+
+class LocalBridge(GeodatabaseBridge):
+    """Stands in for a geodatabase with a directory of xml files, one per dataset path, for tests and working offline.
+    exports/imports count the calls made."""
+    def __init__(self,storeDir,scratchDir=None):
+        super(LocalBridge,self).__init__(scratchDir)
+        self.storeDir=storeDir
+        self.exports=0
+        self.imports=0
+
+    def store_path(self,datasetPath):
+        return os.path.join(self.storeDir,re.sub(r'[^\w.-]','_',datasetPath)+'.xml')
+
+    def export_to(self,pairs):
+        self.exports+=1
+        for datasetPath,xmlPath in pairs:
+            storePath=self.store_path(datasetPath)
+            if os.path.isfile(storePath):
+                shutil.copyfile(storePath,xmlPath)
+            else:
+                with open(xmlPath,'w') as fout:
+                    fout.write('<metadata />')
+
+    def import_from(self,pairs):
+        self.imports+=1
+        for xmlPath,datasetPath in pairs:
+            shutil.copyfile(xmlPath,self.store_path(datasetPath))
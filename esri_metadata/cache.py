@@ -0,0 +1,300 @@
+"""
+Caches of loaded documents: on disk (ParseCache) and in memory (MetadataCache)
+
+ParseCache keeps parsed documents on disk, so that unchanged xml files aren't parsed again
+
+    cache=ParseCache('path/to/cache',maxBytes=512<<20)
+    md=Metadata('path/to/metadata.xml',parseCache=cache)
+    # or for every Metadata
+    Metadata.defaultParseCache=cache
+
+Each entry holds a document's element tree as nested tuples, marshalled, and is used while the xml file's modification
+time and size (and, with useHash, its sha1) are unchanged. The cache directory can be shared by any number of processes:
+entries are written to a temporary file and renamed into place, and an unreadable entry is treated as a miss. The least
+recently used entries are removed once the cache grows past maxBytes/maxEntries.
+
+Comments and processing instructions (kept by lxml) aren't cached.
+
+MetadataCache keeps loaded documents in memory for long running processes (eg. a web service)
+
+    cache=MetadataCache(maxEntries=1000,ttl=300)
+    title=cache.get('connection.sde/fc1').get('dataIdInfo/idCitation/resTitle')
+
+    md=cache.edit('connection.sde/fc1')
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    md.save()
+"""
+import collections
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from . import instrumentation
+from .Metadata import Metadata,replace_file
+from .wrappers.generic.Template import freeze,thaw
+from .wrappers.generic.values import BinaryPayload
+from .wrappers.generic.values.BinaryValues import file_validators
+
+
+# estimated memory used by an element, besides its text and attributes
+ELEMENT_SIZE=200
+
+# bumped when the format of entries changes
+FORMAT_VERSION=1
+HEADER=(FORMAT_VERSION,marshal.version,sys.version_info[0])
+SUFFIX='.mdc'
+
+
+class ParseCache(object):
+    def __init__(self,cacheDir,maxBytes=256<<20,maxEntries=None,useHash=False):
+        self.cacheDir=cacheDir
+        self.maxBytes=maxBytes
+        self.maxEntries=maxEntries
+        self.useHash=useHash
+        # bytes written since entries were last evicted, checking the whole directory on every write would be slow
+        self.written=0
+        self.hits=0
+        self.misses=0
+        self.lock=threading.Lock()
+        if not os.path.isdir(cacheDir):
+            try:
+                os.makedirs(cacheDir)
+            except OSError:
+                # created by another process
+                if not os.path.isdir(cacheDir): raise
+
+
+    def entry_path(self,path):
+        key=os.path.normcase(os.path.abspath(path))
+        if isinstance(key,unicode): key=key.encode('utf-8')
+        return os.path.join(self.cacheDir,hashlib.sha1(key).hexdigest()+SUFFIX)
+
+    def validators(self,path):
+        """Return what identifies the current content of the file at path."""
+        return file_validators(path)+(file_sha1(path) if self.useHash else None,)
+
+
+    def load(self,md,path):
+        """Set md's tree from the entry for the xml file at path, returning False if there isn't a valid one."""
+        entryPath=self.entry_path(path)
+        try:
+            with open(entryPath,'rb') as fin:
+                header,validators,payloads,root=marshal.load(fin)
+        except (IOError,OSError,EOFError,ValueError,TypeError):
+            header=None
+        if header!=HEADER or validators!=self.validators(path):
+            self.misses+=1
+            if instrumentation.enabled: instrumentation.count('parse_cache_misses',1,md)
+            return False
+
+        root=thaw(root,md.backend)
+        md.set_tree(md.backend.element_tree(root))
+        if payloads:
+            elements=list(root.iter())
+            for n,(offset,length) in payloads.items():
+                # the file is as it was when the offsets were taken
+                payload=BinaryPayload(path,offset,length,validators[:2])
+                if md.lazyBinary:
+                    md.binaryPayloads[elements[n]]=payload
+                else:
+                    elements[n].text=payload.read().decode('ascii')
+        self.hits+=1
+        if instrumentation.enabled: instrumentation.count('parse_cache_hits',1,md)
+        # mark as recently used
+        try:
+            os.utime(entryPath,None)
+        except OSError:
+            pass
+        return True
+
+    def store(self,md,path,validators):
+        """Store md's (fully loaded) tree as the entry for the xml file at path, with the validators the file had before
+        it was parsed (see validators): if it changed while being parsed the entry is never used."""
+        payloads={}
+        root=freeze(md.tree.getroot(),md.binaryPayloads,payloads)
+        data=marshal.dumps((HEADER,validators,payloads,root))
+
+        fd,tmpPath=tempfile.mkstemp(suffix='.tmp',dir=self.cacheDir)
+        try:
+            with os.fdopen(fd,'wb') as fout:
+                fout.write(data)
+            replace_file(tmpPath,self.entry_path(path))
+        except:
+            if os.path.exists(tmpPath): os.remove(tmpPath)
+            raise
+
+        if instrumentation.enabled: instrumentation.count('parse_cache_bytes',len(data))
+        with self.lock:
+            self.written+=len(data)
+            evict=self.written>self.maxBytes//10 or self.maxEntries is not None
+            if evict: self.written=0
+        if evict: self.evict()
+
+
+    def entries(self):
+        """Return (last used,size,path) for each entry, least recently used first."""
+        entries=[]
+        for n in os.listdir(self.cacheDir):
+            if not n.endswith(SUFFIX): continue
+            p=os.path.join(self.cacheDir,n)
+            try:
+                st=os.stat(p)
+            except OSError:
+                continue
+            entries.append((st.st_mtime,st.st_size,p))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is within maxBytes and maxEntries."""
+        entries=self.entries()
+        total=sum(size for used,size,p in entries)
+        count=len(entries)
+        for used,size,p in entries:
+            if total<=self.maxBytes and (self.maxEntries is None or count<=self.maxEntries): break
+            try:
+                os.remove(p)
+            except OSError:
+                # removed by another process
+                pass
+            total-=size
+            count-=1
+
+    def clear(self):
+        for used,size,p in self.entries():
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+def estimate_size(md):
+    """Return a rough estimate of the memory used by md's tree, in bytes."""
+    size=0
+    for e in md.tree.getroot().iter():
+        size+=ELEMENT_SIZE+len(e.text or '')+len(e.tail or '')
+        for k,v in e.attrib.items(): size+=len(k)+len(v)
+    return size
+
+
+def file_sha1(path):
+    h=hashlib.sha1()
+    with open(path,'rb') as fin:
+        for c in iter(lambda: fin.read(1<<20),b''): h.update(c)
+    return h.hexdigest()
+
+
+def dataset_validators(datasetPath):
+    """Return the file_validators of an xml file, or None for a geodatabase dataset. Unlike file_validators it doesn't
+    raise for a path that isn't a file: that's how callers (that take any dataset path) tell a dataset from a file."""
+    try:
+        return file_validators(datasetPath)
+    except OSError:
+        return None
+
+
+CacheEntry=collections.namedtuple('CacheEntry','md loaded validators size')
+
+
+class MetadataCache(object):
+    """In memory, least recently used cache of loaded documents.
+
+    get returns a shared document: it can be read from any number of threads at once but not modified (ReadOnlyError is
+    raised). edit returns a copy to modify, saving it writes through to the cache. An entry is loaded again after ttl
+    seconds or, for xml files (with checkFiles), once the file's modification time or size changes. The least recently
+    used entries are dropped once there are more than maxEntries or they use (an estimated) more than maxBytes.
+
+    bridge, backend and parseCache are used to load the documents, see Metadata."""
+    def __init__(self,maxEntries=128,maxBytes=None,ttl=None,checkFiles=True,bridge=None,backend=None,parseCache=None):
+        self.maxEntries=maxEntries
+        self.maxBytes=maxBytes
+        self.ttl=ttl
+        self.checkFiles=checkFiles
+        self.bridge=bridge
+        self.backend=backend
+        self.parseCache=parseCache
+        self.clock=time.time
+        # datasetPath->CacheEntry, least recently used first
+        self.entries=collections.OrderedDict()
+        self.size=0
+        self.hits=0
+        self.misses=0
+        self.lock=threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self,datasetPath):
+        return datasetPath in self.entries
+
+
+    def get(self,datasetPath):
+        """Return the shared document for datasetPath, loading it if it isn't cached (or is out of date)."""
+        md=self.lookup(datasetPath)
+        if instrumentation.enabled: instrumentation.count('memory_cache_misses' if md is None else 'memory_cache_hits')
+        if md is None:
+            with self.lock: self.misses+=1
+            md=Metadata(datasetPath,bridge=self.bridge,backend=self.backend,parseCache=self.parseCache)
+            self.put(md)
+        return md
+
+    def edit(self,datasetPath):
+        """Return a copy of the document for datasetPath to modify, which is put in the cache when saved."""
+        md=self.get(datasetPath).copy()
+        md.metadataCache=self
+        return md
+
+    def saved(self,md):
+        """Called once a copy from edit has been saved to its datasetPath."""
+        shared=md.copy()
+        self.put(shared)
+
+
+    def lookup(self,datasetPath):
+        with self.lock:
+            entry=self.entries.pop(datasetPath,None)
+            if entry is None: return None
+            if self.is_current(entry):
+                # re-insert as the most recently used
+                self.entries[datasetPath]=entry
+                self.hits+=1
+                return entry.md
+            self.size-=entry.size
+            return None
+
+    def is_current(self,entry):
+        if self.ttl is not None and self.clock()-entry.loaded>self.ttl: return False
+        if self.checkFiles and entry.validators is not None:
+            return dataset_validators(entry.md.datasetPath)==entry.validators
+        return True
+
+    def put(self,md):
+        md.shared=True
+        validators=dataset_validators(md.datasetPath) if self.checkFiles else None
+        entry=CacheEntry(md,self.clock(),validators,estimate_size(md) if self.maxBytes is not None else 0)
+        with self.lock:
+            old=self.entries.pop(md.datasetPath,None)
+            if old is not None: self.size-=old.size
+            self.entries[md.datasetPath]=entry
+            self.size+=entry.size
+            while self.entries and self.is_full():
+                datasetPath,dropped=self.entries.popitem(last=False)
+                self.size-=dropped.size
+
+    def is_full(self):
+        if self.maxEntries is not None and len(self.entries)>self.maxEntries: return True
+        return self.maxBytes is not None and self.size>self.maxBytes
+
+    def invalidate(self,datasetPath=None):
+        """Drop the entry for datasetPath, or all of them."""
+        with self.lock:
+            if datasetPath is None:
+                self.entries.clear()
+                self.size=0
+            else:
+                entry=self.entries.pop(datasetPath,None)
+                if entry is not None: self.size-=entry.size
@@ -0,0 +1,53 @@
+"""
+Bounded thread pools to load and save documents in without blocking the caller, see Metadata.aload and Metadata.asave
+
+    future=Metadata.aload('connection.sde/fc1')
+    md=future.result()
+
+    # in an asyncio event loop (python 3)
+    md=await asyncio.wrap_future(Metadata.aload(path))
+
+xml files and datasets that aren't xml files (exported/imported through the bridge, ie. arcpy) have a pool each, so
+that requests for one don't queue behind the other and the geodatabase isn't overloaded: geodatabase work is done one at
+a time by default. A request that hasn't started can be cancelled through its future. Requires the futures backport on
+python 2.
+"""
+import threading
+
+
+FILE='file'
+GEODATABASE='geodatabase'
+
+
+class Executors(object):
+    def __init__(self,fileWorkers=8,geodatabaseWorkers=1):
+        self.workers={FILE:fileWorkers,GEODATABASE:geodatabaseWorkers}
+        # kind->ThreadPoolExecutor, created on first use
+        self.executors={}
+        self.lock=threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.shutdown()
+
+
+    def executor(self,kind):
+        with self.lock:
+            executor=self.executors.get(kind)
+            if executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                executor=self.executors[kind]=ThreadPoolExecutor(self.workers[kind])
+        return executor
+
+    def submit(self,kind,func,*args):
+        """Run func(*args) in the pool for kind (FILE or GEODATABASE), returning a concurrent.futures Future."""
+        return self.executor(kind).submit(func,*args)
+
+    def shutdown(self,wait=True):
+        with self.lock:
+            executors=list(self.executors.values())
+            self.executors.clear()
+        for executor in executors:
+            executor.shutdown(wait)
@@ -0,0 +1,214 @@
+"""
+Export fields of many metadata documents, column by column, to CSV, Parquet or Arrow
+
+    fields=[
+        ('title','dataIdInfo/idCitation/resTitle'),
+        ('topics','dataIdInfo/tpCat[*]/TopicCatCd/value'),
+        ('keywords','dataIdInfo/themeKeys[*]/keyword[*]'),
+        'Esri/ModDate',
+    ]
+    with export.CsvWriter('out.csv') as writer:
+        export.export(paths,fields,writer,batchSize=5000)
+
+Fields are schema paths (see Metadata.compile_path), optionally named. Only the parts of each document needed for the
+fields are parsed, values are appended to one list per field and handed to the writer every batchSize documents, so
+memory use depends on batchSize rather than the number of documents. A path with [*] fans out to a list of values per
+document (a list column in Parquet/Arrow, joined with listSeparator in CSV).
+"""
+import datetime
+
+from .Metadata import Metadata
+from .batch import ITEM_ERRORS,chunked
+from .wrappers.generic.values import IntegerValue,BinaryValue
+from .wrappers.generic.values.DateTimeValues import DateTimeValueBaseClass
+from .wrappers.generic.values.BooleanValues import BooleanValueBaseClass
+
+
+def compile_fields(fields):
+    """Return (name,SchemaPath) for each field, a path or (name,path)."""
+    compiled=[]
+    for f in fields:
+        name,path=(f,f) if isinstance(f,basestring) else f
+        compiled.append((name,Metadata.compile_path(path)))
+    return compiled
+
+
+class Columns(object):
+    """A batch of records held as a list of values per column. The lists are reused from batch to batch."""
+    def __init__(self,names):
+        self.names=list(names)
+        self.values=[[] for n in self.names]
+
+    def __len__(self):
+        return len(self.values[0]) if self.values else 0
+
+    def append(self,row):
+        for column,v in zip(self.values,row):
+            column.append(v)
+
+    def clear(self):
+        for column in self.values:
+            del column[:]
+
+
+def export(datasetPaths,fields,writer,batchSize=1000,pathColumn='datasetPath',onError=None,bridge=None,backend=None):
+    """Read fields from each of datasetPaths and write them with writer (a ColumnWriter), batchSize documents at a time.
+
+    pathColumn is the name of a leading column holding the dataset path (None to leave it out). A document with an
+    invalid value raises, unless onError is given: it's then called with the dataset path and the error and the document
+    is left out (as is a document that can't be loaded, see Metadata.load_many). Returns the number of documents
+    written."""
+    fields=compile_fields(fields)
+    schemaPaths=[p for n,p in fields]
+    names=[n for n,p in fields]
+    if pathColumn is not None:
+        names.insert(0,pathColumn)
+    writer.open(names,[None]*(pathColumn is not None)+schemaPaths)
+
+    columns=Columns(names)
+    count=0
+    for chunk in chunked(datasetPaths,batchSize):
+        for md in Metadata.load_many(chunk,paths=schemaPaths,bridge=bridge,backend=backend,onError=onError):
+            try:
+                # read the whole record before appending any of it so the columns stay the same length
+                row=[p.read(md.element,md) for p in schemaPaths]
+            except ITEM_ERRORS as e:
+                if onError is None: raise
+                onError(md.datasetPath,e)
+                continue
+            if pathColumn is not None:
+                row.insert(0,md.datasetPath)
+            columns.append(row)
+        if len(columns):
+            writer.write(columns)
+            count+=len(columns)
+            columns.clear()
+    return count
+
+
+class ColumnWriter(object):
+    """Writes batches of Columns to target (a path or file object). Subclasses implement start and write."""
+    def __init__(self,target):
+        self.target=target
+        self.names=None
+        self.schemaPaths=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+
+    def open(self,names,schemaPaths):
+        """Called once before writing with the column names and the SchemaPath of each (None for the dataset path)."""
+        self.names=names
+        self.schemaPaths=schemaPaths
+        self.start()
+
+    def close(self):
+        pass
+
+
+    def start(self):
+        raise NotImplementedError()
+
+    def write(self,columns):
+        raise NotImplementedError()
+
+
+class CsvWriter(ColumnWriter):
+    """CSV with a header row, dates in ISO format and the values of a list column joined with listSeparator."""
+    def __init__(self,target,listSeparator='|',encoding='utf-8'):
+        super(CsvWriter,self).__init__(target)
+        self.listSeparator=listSeparator
+        self.encoding=encoding
+        self.fout=None
+        self.ownsFile=False
+
+    def start(self):
+        import csv
+        if hasattr(self.target,'write'):
+            self.fout=self.target
+        else:
+            self.fout=open(self.target,'wb')
+            self.ownsFile=True
+        self.writer=csv.writer(self.fout)
+        self.writer.writerow([self.format_value(n) for n in self.names])
+
+    def write(self,columns):
+        formatted=[[self.format_value(v) for v in column] for column in columns.values]
+        self.writer.writerows(zip(*formatted))
+
+    def close(self):
+        if self.ownsFile and self.fout is not None:
+            self.fout.close()
+            self.fout=None
+
+
+    def format_value(self,v):
+        if v is None:
+            return ''
+        if isinstance(v,list):
+            return self.listSeparator.join(self.format_value(i) for i in v if i is not None)
+        if isinstance(v,datetime.datetime):
+            return v.isoformat()
+        if isinstance(v,unicode):
+            return v.encode(self.encoding)
+        return str(v)
+
+
+def arrow_type(pa,schemaPath):
+    """Return the arrow type for the values read by schemaPath (None for the dataset path)."""
+    if schemaPath is None:
+        return pa.string()
+    w=schemaPath.valueWrapper
+    if isinstance(w,IntegerValue):
+        t=pa.int64()
+    elif isinstance(w,DateTimeValueBaseClass):
+        t=pa.timestamp('s')
+    elif isinstance(w,BooleanValueBaseClass):
+        t=pa.bool_()
+    elif isinstance(w,BinaryValue):
+        t=pa.binary()
+    else:
+        t=pa.string()
+    return pa.list_(t) if schemaPath.many else t
+
+
+class ArrowWriter(ColumnWriter):
+    """Arrow IPC file, one record batch per batch of documents (requires pyarrow). Column types come from the schema."""
+    def start(self):
+        import pyarrow
+        self.pa=pyarrow
+        self.schema=pyarrow.schema([pyarrow.field(n,arrow_type(pyarrow,p)) for n,p in zip(self.names,self.schemaPaths)])
+        self.writer=self.open_writer()
+
+    def open_writer(self):
+        return self.pa.RecordBatchFileWriter(self.target,self.schema)
+
+    def write(self,columns):
+        arrays=[self.pa.array(column,type=f.type) for column,f in zip(columns.values,self.schema)]
+        self.write_batch(self.pa.RecordBatch.from_arrays(arrays,self.names))
+
+    def write_batch(self,batch):
+        self.writer.write_batch(batch)
+
+    def close(self):
+        if getattr(self,'writer',None) is not None:
+            self.writer.close()
+            self.writer=None
+
+
+class ParquetWriter(ArrowWriter):
+    """Parquet file, one row group per batch of documents (requires pyarrow)."""
+    def __init__(self,target,compression='snappy'):
+        super(ParquetWriter,self).__init__(target)
+        self.compression=compression
+
+    def open_writer(self):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(self.target,self.schema,compression=self.compression)
+
+    def write_batch(self,batch):
+        self.writer.write_table(self.pa.Table.from_batches([batch]))
@@ -0,0 +1,193 @@
+"""
+A search index of fields across many documents, in SQLite, so that questions about a catalogue are answered without
+opening the documents again
+
+    idx=index.Index('catalogue.sqlite')
+    idx.update(paths) # only new and changed xml files are read
+    idx.query(('topic','008'))
+    idx.query(('securityClass',index.PRESENT))
+    modified=idx.query(('modDate','>',datetime.datetime(2020,1,1)))
+    idx.values('contact',modified) # {datasetPath:[values]}
+
+Fields are (name,schema path) pairs (see DEFAULT_FIELDS and Metadata.compile_path), several paths can share a name
+(eg. keyword). Only the parts of each document needed for the fields are parsed. An xml file is read again once its
+modification time or size changes, datasets that aren't xml files (read through the bridge) are read on every update.
+Changing the fields clears the index.
+"""
+import datetime
+import json
+import sqlite3
+
+from .Metadata import Metadata
+from .batch import ITEM_ERRORS,chunked
+from .cache import dataset_validators
+from .export import compile_fields
+from .serialisation import parse_iso
+from .wrappers.generic.values.DateTimeValues import DateTimeValueBaseClass
+
+
+DEFAULT_FIELDS=[
+    ('keyword','dataIdInfo/themeKeys[*]/keyword[*]'),
+    ('keyword','dataIdInfo/placeKeys[*]/keyword[*]'),
+    ('keyword','dataIdInfo/searchKeys[*]/keyword[*]'),
+    ('topic','dataIdInfo/tpCat[*]/TopicCatCd/value'),
+    ('securityClass','mdConst[*]/SecConsts/class/ClasscationCd/value'),
+    ('contact','dataIdInfo/idPoC/rpIndName'),
+    ('contactOrg','dataIdInfo/idPoC/rpOrgName'),
+    ('contactEmail','dataIdInfo/idPoC/rpCntInfo/cntAddress/eMailAdd[*]'),
+    ('modDate','Esri/ModDate'),
+    ('fileID','mdFileID'),
+]
+
+# the value of a condition matching documents with any value for a field (None is never stored), see Index.query
+PRESENT=None
+OPERATORS=('=','!=','<','<=','>','>=','like')
+
+SCHEMA="""
+CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY,value TEXT);
+CREATE TABLE IF NOT EXISTS documents (id INTEGER PRIMARY KEY,datasetPath TEXT UNIQUE NOT NULL,mtime REAL,size INTEGER);
+CREATE TABLE IF NOT EXISTS terms (documentId INTEGER NOT NULL,field TEXT NOT NULL,value);
+CREATE INDEX IF NOT EXISTS terms_field_value ON terms (field,value);
+CREATE INDEX IF NOT EXISTS terms_document ON terms (documentId);
+"""
+
+
+def to_sql(v):
+    """Return a value as stored in the index: dates/times as ISO text (which sorts in time order)."""
+    if isinstance(v,datetime.datetime):
+        return v.isoformat()
+    if isinstance(v,bool):
+        return int(v)
+    return v
+
+
+class Index(object):
+    def __init__(self,dbPath,fields=DEFAULT_FIELDS):
+        self.dbPath=dbPath
+        self.fields=compile_fields(fields)
+        self.dateFields=set(n for n,p in self.fields if isinstance(p.valueWrapper,DateTimeValueBaseClass))
+        self.connection=sqlite3.connect(dbPath)
+        self.connection.executescript(SCHEMA)
+        self.check_fields()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def __contains__(self,datasetPath):
+        return self.connection.execute('SELECT 1 FROM documents WHERE datasetPath=?',(datasetPath,)).fetchone() is not None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection=None
+
+
+    def check_fields(self):
+        """Clear the index if it was built with other fields."""
+        fields=json.dumps([(n,p.path) for n,p in self.fields])
+        row=self.connection.execute("SELECT value FROM settings WHERE name='fields'").fetchone()
+        if row is not None and row[0]==fields: return
+        with self.connection:
+            self.connection.execute('DELETE FROM terms')
+            self.connection.execute('DELETE FROM documents')
+            self.connection.execute("INSERT OR REPLACE INTO settings (name,value) VALUES ('fields',?)",(fields,))
+
+
+    def update(self,datasetPaths,prune=False,batchSize=1000,onError=None,bridge=None,backend=None):
+        """Index those of datasetPaths that are new or have changed, batchSize at a time, returning the number read. prune
+        removes the documents that aren't in datasetPaths.
+
+        A document with an invalid value (or that can't be loaded) raises, unless onError is given: it's then called with
+        the dataset path and the error and the document is left out (and read again on the next update)."""
+        datasetPaths=list(datasetPaths)
+        known=dict((p,(mtime,size)) for p,mtime,size in self.connection.execute('SELECT datasetPath,mtime,size FROM documents'))
+        # taken before reading, if a file changes while this runs it's read again on the next update
+        validators={}
+        for p in datasetPaths:
+            v=dataset_validators(p)
+            if v is None or known.get(p)!=v: validators[p]=v
+        stale=[p for p in datasetPaths if p in validators]
+
+        schemaPaths=[p for n,p in self.fields]
+        def failed(datasetPath,e):
+            onError(datasetPath,e)
+            self.remove([datasetPath])
+        count=0
+        for chunk in chunked(stale,batchSize):
+            mds=Metadata.load_many(chunk,paths=schemaPaths,bridge=bridge,backend=backend,onError=None if onError is None else failed)
+            with self.connection:
+                for md in mds:
+                    try:
+                        terms=self.extract(md)
+                    except ITEM_ERRORS as e:
+                        if onError is None: raise
+                        onError(md.datasetPath,e)
+                        self.remove([md.datasetPath])
+                        continue
+                    self.store(md.datasetPath,validators[md.datasetPath],terms)
+                    count+=1
+        if prune:
+            self.remove(set(known)-set(datasetPaths))
+        return count
+
+    def extract(self,md):
+        """Return (field,value) for each value of the fields in md."""
+        terms=[]
+        for name,p in self.fields:
+            v=p.read(md.element,md)
+            for value in (v if p.many else [v]):
+                if value is not None: terms.append((name,to_sql(value)))
+        return terms
+
+    def store(self,datasetPath,validators,terms):
+        mtime,size=validators if validators is not None else (None,None)
+        c=self.connection
+        c.execute('DELETE FROM terms WHERE documentId IN (SELECT id FROM documents WHERE datasetPath=?)',(datasetPath,))
+        documentId=c.execute('INSERT OR REPLACE INTO documents (datasetPath,mtime,size) VALUES (?,?,?)',(datasetPath,mtime,size)).lastrowid
+        c.executemany('INSERT INTO terms (documentId,field,value) VALUES (?,?,?)',((documentId,n,v) for n,v in terms))
+
+    def remove(self,datasetPaths):
+        """Remove the documents of datasetPaths from the index."""
+        with self.connection:
+            for p in datasetPaths:
+                self.connection.execute('DELETE FROM terms WHERE documentId IN (SELECT id FROM documents WHERE datasetPath=?)',(p,))
+                self.connection.execute('DELETE FROM documents WHERE datasetPath=?',(p,))
+
+
+    def query(self,*conditions):
+        """Return the (sorted) dataset paths of the documents matching all of conditions. Each is (field,value) or
+        (field,operator,value) with an operator of OPERATORS, eg. ('modDate','>',datetime.datetime(2020,1,1)), and a value
+        of PRESENT matches any value. A document matches if any of the field's values does."""
+        clauses=[]
+        args=[]
+        for c in conditions:
+            field,op,value=(c[0],'=',c[1]) if len(c)==2 else c
+            if op not in OPERATORS:
+                raise ValueError('Unknown operator: {}'.format(op))
+            clause='EXISTS (SELECT 1 FROM terms WHERE documentId=documents.id AND field=?'
+            args.append(field)
+            if value is not PRESENT:
+                clause+=' AND value {} ?'.format(op)
+                args.append(to_sql(value))
+            clauses.append(clause+')')
+        sql='SELECT datasetPath FROM documents'
+        if clauses: sql+=' WHERE '+' AND '.join(clauses)
+        return [p for p, in self.connection.execute(sql+' ORDER BY datasetPath',args)]
+
+    def values(self,field,datasetPaths=None):
+        """Return {datasetPath:[values]} of field for each of datasetPaths (default: every document) that has any."""
+        sql='SELECT d.datasetPath,t.value FROM terms t JOIN documents d ON t.documentId=d.id WHERE t.field=?'
+        rows=self.connection.execute(sql+' ORDER BY t.rowid',(field,))
+        wanted=None if datasetPaths is None else set(datasetPaths)
+        values={}
+        for p,v in rows:
+            if wanted is not None and p not in wanted: continue
+            if field in self.dateFields: v=parse_iso(v)
+            values.setdefault(p,[]).append(v)
+        return values
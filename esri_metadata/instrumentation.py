@@ -0,0 +1,115 @@
+"""
+Counters and timers for the hot paths, off by default
+
+    from esri_metadata import instrumentation
+
+    instrumentation.enable()
+    md=Metadata('path/to/metadata.xml')
+    ...
+    print(md.stats)                     # for one document
+    print(instrumentation.processStats) # for everything in this process
+
+    # or send each event to a metrics pipeline
+    instrumentation.enable(lambda name,value,document: metrics.add(name,value))
+
+Per document and process: binds (wrappers binding to their element), child_scans (an element's children being
+indexed), value_parses and value_cache_hits, parse_cache_hits/misses, the xml_parse and xml_write timers (a count and,
+as name_seconds, the total time) and temp_bytes (written to temporary files when saving).
+
+Per process only: memory_cache_hits/misses (cache.MetadataCache), parse_cache_bytes (written to the parse cache),
+scratch_files (created by the bridge), the bridge_export/bridge_import timers (each call of export_metadata and
+import_metadata) and arcpy_export/arcpy_import (each arcpy tool call).
+
+When disabled each hook is a check of instrumentation.enabled.
+"""
+import collections
+import time
+
+
+enabled=False
+callback=None
+
+
+class Stats(object):
+    def __init__(self):
+        self.counts=collections.defaultdict(int)
+        self.seconds=collections.defaultdict(float)
+
+    def __repr__(self):
+        return 'Stats({})'.format(', '.join('{}={}'.format(k,v) for k,v in sorted(self.as_dict().items())))
+
+    def add(self,name,n=1):
+        self.counts[name]+=n
+
+    def add_time(self,name,seconds):
+        self.counts[name]+=1
+        self.seconds[name]+=seconds
+
+    def as_dict(self):
+        """Return the counts and, for timers, name+'_seconds' totals as one dict."""
+        d=dict(self.counts)
+        for k,v in self.seconds.items(): d[k+'_seconds']=v
+        return d
+
+    def reset(self):
+        self.counts.clear()
+        self.seconds.clear()
+
+
+processStats=Stats()
+
+
+def enable(cb=None):
+    """Start counting, calling cb(name,value,document) (if given) for each event: value is a count or, for timers, the
+    seconds taken. document is the Metadata the event belongs to, if any."""
+    global enabled,callback
+    callback=cb
+    enabled=True
+
+def disable():
+    global enabled,callback
+    enabled=False
+    callback=None
+
+
+def document_stats(document):
+    s=document.stats
+    if s is None: s=document.stats=Stats()
+    return s
+
+def count(name,n=1,document=None):
+    """Add n to the count of name (callers check enabled first)."""
+    processStats.add(name,n)
+    if document is not None: document_stats(document).add(name,n)
+    if callback is not None: callback(name,n,document)
+
+def add_time(name,seconds,document=None):
+    processStats.add_time(name,seconds)
+    if document is not None: document_stats(document).add_time(name,seconds)
+    if callback is not None: callback(name,seconds,document)
+
+
+class Timer(object):
+    def __init__(self,name,document):
+        self.name=name
+        self.document=document
+
+    def __enter__(self):
+        self.start=time.time()
+        return self
+
+    def __exit__(self,*args):
+        add_time(self.name,time.time()-self.start,self.document)
+
+class NullTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        pass
+
+NULL_TIMER=NullTimer()
+
+def timer(name,document=None):
+    """Return a context manager timing its block as name (doing nothing when disabled)."""
+    return Timer(name,document) if enabled else NULL_TIMER
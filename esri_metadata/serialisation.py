@@ -0,0 +1,130 @@
+"""
+Convert documents to and from plain dicts and JSON, driven by the schema, see Metadata.to_dict/to_json/from_dict
+
+Elements are keyed by name, Lists are lists and text containers (eg. resTitle) are their (typed) value. Anything that
+isn't in the schema is left out, as are absent elements. In JSON, dates/times are in ISO format and binary values are
+base64 text.
+"""
+import datetime
+import json
+
+from .wrappers.errors import InvalidStructureError
+from .wrappers.generic import Container,List
+from .wrappers.generic.values import TextScalarValue,AttributeScalarValue,BinaryValue
+from .wrappers.generic.values.DateTimeValues import DateTimeValueBaseClass
+
+
+ISO_FORMATS=('%Y-%m-%dT%H:%M:%S','%Y-%m-%dT%H:%M:%S.%f','%Y-%m-%d')
+
+
+def is_text_container(mapping):
+    return len(mapping)==1 and isinstance(mapping.get('text'),TextScalarValue)
+
+
+def to_dict(md,forJson=False,skipBinary=False):
+    """Return md (a bound Metadata) as a dict, in one pass over its tree. forJson gives JSON compatible values."""
+    if md.element is None: return {}
+    return element_to_dict(md,md.element,md.compile_children(),forJson,skipBinary)
+
+def element_to_dict(md,element,mapping,forJson,skipBinary):
+    d={}
+    find=md.childIndex.find
+    for name,w in mapping.items():
+        if isinstance(w,AttributeScalarValue):
+            if element.get(name) is not None:
+                d[name]=convert_value(md,element,w,forJson)
+        elif isinstance(w,TextScalarValue):
+            d[name]=convert_value(md,element,w,forJson)
+        elif isinstance(w,List):
+            children=find(element,name)
+            if not children: continue
+            itemMapping=w.itemType.compile_children()
+            d[name]=[convert_element(md,e,itemMapping,forJson,skipBinary) for e in children]
+        elif isinstance(w,Container):
+            children=find(element,name)
+            if not children: continue
+            if len(children)>1:
+                raise InvalidStructureError('Multiple elements found when expecting one: {}'.format(name))
+            if skipBinary and isinstance(w.mapping.get('text'),BinaryValue): continue
+            d[name]=convert_element(md,children[0],w.mapping,forJson,skipBinary)
+    return d
+
+def convert_element(md,element,mapping,forJson,skipBinary):
+    if is_text_container(mapping):
+        return convert_value(md,element,mapping['text'],forJson)
+    return element_to_dict(md,element,mapping,forJson,skipBinary)
+
+def convert_value(md,element,w,forJson):
+    if forJson:
+        if isinstance(w,BinaryValue):
+            payload=md.binaryPayloads.get(element)
+            text=payload.read().decode('ascii') if payload is not None else element.text
+            return None if text is None else ''.join(text.split())
+        v=w.read_value(element,md)
+        if isinstance(v,datetime.datetime):
+            return v.isoformat()
+        return v
+    return w.read_value(element,md)
+
+
+def to_json(md,fileobj,skipBinary=False,indent=None):
+    """Write md as JSON to fileobj, one top level element at a time."""
+    encoder=json.JSONEncoder(indent=indent,sort_keys=True)
+    fileobj.write('{')
+    if md.element is not None:
+        mapping=md.compile_children()
+        first=True
+        for name in sorted(mapping):
+            part=element_to_dict(md,md.element,{name:mapping[name]},True,skipBinary)
+            if name not in part: continue
+            if not first: fileobj.write(', ')
+            first=False
+            fileobj.write(encoder.encode(name)+': ')
+            for chunk in encoder.iterencode(part[name]):
+                fileobj.write(chunk)
+    fileobj.write('}')
+
+
+def from_dict(d,mapping,rootTag,backend):
+    """Return the root element built from d, a dict as returned by to_dict (with either typed or JSON values)."""
+    root=backend.element(rootTag)
+    build_element(d,root,mapping,backend)
+    return root
+
+def build_element(d,element,mapping,backend):
+    for name,v in d.items():
+        w=mapping.get(name)
+        if w is None:
+            raise InvalidStructureError('{} is not in the schema of {}'.format(name,element.tag))
+        if isinstance(w,AttributeScalarValue):
+            if v is not None: element.set(name,format_value(w,v))
+        elif isinstance(w,TextScalarValue):
+            element.text=None if v is None else format_value(w,v)
+        elif isinstance(w,List):
+            itemMapping=w.itemType.compile_children()
+            for item in v:
+                build_child(item,backend.sub_element(element,name),itemMapping,backend)
+        elif isinstance(w,Container):
+            build_child(v,backend.sub_element(element,name),w.mapping,backend)
+
+def build_child(v,element,mapping,backend):
+    if is_text_container(mapping):
+        if v is not None: element.text=format_value(mapping['text'],v)
+    else:
+        build_element(v,element,mapping,backend)
+
+def format_value(w,v):
+    if isinstance(w,BinaryValue):
+        # text (from JSON) is already base64, bytes are the value itself
+        return v if isinstance(v,unicode) else w.format_value(v)
+    if isinstance(v,basestring) and isinstance(w,DateTimeValueBaseClass):
+        v=parse_iso(v)
+    return w.format_value(v)
+
+def parse_iso(v):
+    for f in ISO_FORMATS:
+        try:
+            return datetime.datetime.strptime(v,f)
+        except ValueError:
+            pass
+    raise ValueError('Invalid ISO date/time: {}'.format(v))
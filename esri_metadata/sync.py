@@ -0,0 +1,217 @@
+"""
+Incremental processing of a catalogue: a manifest of each dataset as it was when last processed, so that a run only
+hands on the datasets that have changed since
+
+    manifest=sync.Manifest('catalogue.manifest')
+    for r in manifest.sync(paths,stamp,save=True,workers=4):
+        print(r.datasetPath,r.value if r.ok else r.error)
+
+    # or with any other loader/editor
+    changed=manifest.plan(paths)
+    idx.update(changed)
+    manifest.record(changed)
+
+An xml file has changed once its modification time or size (and, with useHash, its sha1) changes. A dataset that isn't
+an xml file has its metadata exported through the bridge to read Esri/ModDate, ModTime and SyncDate, and has
+changed once any of them do (or if it has none of them).
+
+The datasets found to have changed are kept in the manifest until they're recorded, which sync does every
+checkpointEvery datasets, so the next call of sync after an interrupted run resumes it where it stopped.
+"""
+import sqlite3
+import time
+
+from .Metadata import Metadata
+from .batch import Result,process,chunked
+from .cache import dataset_validators,file_sha1
+
+
+STAMP_PATHS=('Esri/ModDate','Esri/ModTime','Esri/SyncDate')
+# a dataset's signature, what it's compared on
+COLUMNS=('mtime','size','sha1','modDate','modTime','syncDate')
+
+SCHEMA="""
+CREATE TABLE IF NOT EXISTS datasets (datasetPath TEXT PRIMARY KEY,{0},recorded REAL);
+CREATE TABLE IF NOT EXISTS pending (datasetPath TEXT PRIMARY KEY,{0},position INTEGER);
+""".format(','.join(COLUMNS))
+
+
+def raw_text(md,schemaPath):
+    elements=schemaPath.find_elements(md.element,md.childIndex) if md.element is not None else []
+    return elements[0].text if elements else None
+
+def read_stamps(datasetPaths,batchSize=1000,bridge=None,backend=None,onError=None):
+    """Return {datasetPath:(ModDate,ModTime,SyncDate)} as written in each dataset's metadata (unparsed). A dataset whose
+    metadata can't be loaded raises, unless onError is given (see Metadata.load_many): it's then left out."""
+    schemaPaths=[Metadata.compile_path(p) for p in STAMP_PATHS]
+    stamps={}
+    for chunk in chunked(datasetPaths,batchSize):
+        for md in Metadata.load_many(chunk,paths=schemaPaths,bridge=bridge,backend=backend,onError=onError):
+            stamps[md.datasetPath]=tuple(raw_text(md,p) for p in schemaPaths)
+    return stamps
+
+
+class Manifest(object):
+    def __init__(self,dbPath,useHash=False,batchSize=1000,bridge=None,backend=None):
+        """bridge and backend are used (batchSize datasets at a time) to read the Esri dates of datasets that aren't xml
+        files."""
+        self.dbPath=dbPath
+        self.useHash=useHash
+        self.batchSize=batchSize
+        self.bridge=bridge
+        self.backend=backend
+        # {datasetPath:error} of the datasets whose metadata couldn't be read by the last plan
+        self.errors={}
+        self.connection=sqlite3.connect(dbPath)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection=None
+
+
+    def file_signature(self,path,validators):
+        return validators+(file_sha1(path) if self.useHash else None,None,None,None)
+
+    def signatures(self,datasetPaths,onError=None):
+        """Return {datasetPath:signature} for each of datasetPaths as it is now, leaving out (and passing to onError, see
+        read_stamps) those whose metadata can't be read."""
+        signatures={}
+        others=[]
+        for p in datasetPaths:
+            v=dataset_validators(p)
+            if v is None:
+                others.append(p)
+            else:
+                signatures[p]=self.file_signature(p,v)
+        for p,stamps in read_stamps(others,self.batchSize,self.bridge,self.backend,onError).items():
+            signatures[p]=(None,None,None)+stamps
+        return signatures
+
+    def recorded(self,table='datasets'):
+        """Return {datasetPath:signature} of the recorded (or pending) datasets."""
+        sql='SELECT datasetPath,{} FROM {}'.format(','.join(COLUMNS),table)
+        return dict((row[0],tuple(row[1:])) for row in self.connection.execute(sql))
+
+    def store(self,table,datasetPath,signature,column,value):
+        """Write datasetPath's signature to table, with value for its other column (position or recorded)."""
+        sql='INSERT OR REPLACE INTO {} (datasetPath,{},{}) VALUES ({})'.format(table,','.join(COLUMNS),column,','.join('?'*(len(COLUMNS)+2)))
+        self.connection.execute(sql,(datasetPath,)+tuple(signature)+(value,))
+
+
+    def plan(self,datasetPaths,prune=False):
+        """Return those of datasetPaths that are new or have changed since they were recorded, which become the pending
+        datasets (replacing any left from an interrupted run). prune forgets the datasets that aren't in datasetPaths.
+
+        The datasets whose metadata can't be read are left out, with their errors in errors."""
+        datasetPaths=list(datasetPaths)
+        self.errors={}
+        known=self.recorded()
+        changed={}
+        touched={}
+        others=[]
+        for p in datasetPaths:
+            v=dataset_validators(p)
+            if v is None:
+                others.append(p)
+                continue
+            old=known.get(p)
+            if old is not None and old[:2]==v: continue
+            signature=self.file_signature(p,v)
+            if old is not None and signature[2] is not None and signature[2]==old[2]:
+                # modified but with the same content
+                touched[p]=signature
+            else:
+                changed[p]=signature
+        for p,stamps in read_stamps(others,self.batchSize,self.bridge,self.backend,self.errors.__setitem__).items():
+            signature=(None,None,None)+stamps
+            if not any(stamps) or known.get(p)!=signature: changed[p]=signature
+
+        ordered=[]
+        seen=set()
+        for p in datasetPaths:
+            if p in changed and p not in seen:
+                seen.add(p)
+                ordered.append(p)
+        with self.connection:
+            self.connection.execute('DELETE FROM pending')
+            for i,p in enumerate(ordered):
+                self.store('pending',p,changed[p],'position',i)
+            now=time.time()
+            for p,signature in touched.items():
+                self.store('datasets',p,signature,'recorded',now)
+            if prune:
+                keep=set(datasetPaths)
+                for p in known:
+                    if p not in keep: self.connection.execute('DELETE FROM datasets WHERE datasetPath=?',(p,))
+        return ordered
+
+    def pending(self):
+        """Return the datasets planned but not yet recorded, in order."""
+        return [p for p, in self.connection.execute('SELECT datasetPath FROM pending ORDER BY position')]
+
+    def record(self,datasetPaths,modified=()):
+        """Record datasetPaths as processed, with the signatures they had when planned (or have now, if they weren't).
+        The datasets of modified (eg. those saved) have their signatures taken again, those that then can't be read are left
+        unrecorded."""
+        datasetPaths=list(datasetPaths)
+        pending=self.recorded('pending')
+        modified=set(modified)
+        failed={}
+        signatures=self.signatures([p for p in datasetPaths if p in modified or p not in pending],failed.__setitem__)
+        now=time.time()
+        with self.connection:
+            for p in datasetPaths:
+                if p in failed: continue
+                self.store('datasets',p,signatures.get(p,pending.get(p)),'recorded',now)
+                self.connection.execute('DELETE FROM pending WHERE datasetPath=?',(p,))
+
+    def forget(self,datasetPaths=None):
+        """Remove datasetPaths (or all datasets) from the manifest, so that they're processed on the next run."""
+        with self.connection:
+            if datasetPaths is None:
+                self.connection.execute('DELETE FROM datasets')
+                self.connection.execute('DELETE FROM pending')
+            else:
+                for p in datasetPaths:
+                    self.connection.execute('DELETE FROM datasets WHERE datasetPath=?',(p,))
+
+
+    def sync(self,datasetPaths,func,save=False,checkpointEvery=100,resume=True,prune=False,workers=None,chunkSize=1,progress=None,schemaPaths=None):
+        """Run func over the datasets of datasetPaths that have changed, see batch.process (with which the rest of the
+        arguments are used), yielding a Result for each.
+
+        Datasets are recorded every checkpointEvery successful Results (and when the run stops). Those with errors are left
+        to be tried again. With resume, the datasets left pending by an interrupted run are processed instead of planning
+        a new run. The datasets whose metadata can't be read when planning are yielded first, as Results with the error."""
+        paths=self.pending() if resume else []
+        if not paths:
+            paths=self.plan(datasetPaths,prune)
+            for p,e in self.errors.items(): yield Result(p,error=e)
+        done=[]
+        saved=[]
+        try:
+            for r in process(paths,func,save,workers,chunkSize,False,progress,schemaPaths):
+                if r.ok:
+                    done.append(r.datasetPath)
+                    if r.saved: saved.append(r.datasetPath)
+                    if len(done)>=checkpointEvery:
+                        self.record(done,saved)
+                        done=[]
+                        saved=[]
+                yield r
+        finally:
+            if done: self.record(done,saved)
+        # the run is complete, failures are found again by the next plan
+        with self.connection:
+            self.connection.execute('DELETE FROM pending')
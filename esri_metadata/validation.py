@@ -0,0 +1,96 @@
+"""
+Validate a whole document in one pass, see Metadata.validate
+
+    report=md.validate()
+    if not report.ok:
+        for p in report: print(p.path,p.message)
+"""
+import collections
+
+from .wrappers.errors import InvalidValueError,InvalidStructureError
+from .wrappers.generic import Container,List
+from .wrappers.generic.values import TextScalarValue,AttributeScalarValue
+
+
+# kinds of problem
+VALUE='value'
+STRUCTURE='structure'
+
+Problem=collections.namedtuple('Problem','path kind message')
+
+
+class ValidationReport(object):
+    """The problems found in a document: values that can't be parsed and elements repeated where only one is expected."""
+    def __init__(self,datasetPath=None):
+        self.datasetPath=datasetPath
+        self.problems=[]
+
+    @property
+    def ok(self):
+        return not self.problems
+
+    def __len__(self):
+        return len(self.problems)
+
+    def __iter__(self):
+        return iter(self.problems)
+
+    def __repr__(self):
+        return 'ValidationReport({!r}, {} problem(s))'.format(self.datasetPath,len(self.problems))
+
+    def __str__(self):
+        return '\n'.join('{}: {} ({})'.format(p.path,p.message,p.kind) for p in self.problems)
+
+
+    def add(self,path,kind,message):
+        self.problems.append(Problem(path,kind,message))
+
+    @property
+    def paths(self):
+        return [p.path for p in self.problems]
+
+
+def validate(md):
+    """Return a ValidationReport for md (a bound Metadata), walking its schema and element tree together once."""
+    report=ValidationReport(md.datasetPath)
+    if md.element is None:
+        report.add('',STRUCTURE,'The root element is not {}'.format(md.name))
+    else:
+        validate_element(md,md.element,md.compile_children(),'',report)
+    return report
+
+def validate_element(md,element,mapping,path,report):
+    find=md.childIndex.find
+    for name,w in mapping.items():
+        if isinstance(w,TextScalarValue):
+            # the thumbnail's (lazy) payload isn't read
+            if element in md.binaryPayloads: continue
+            validate_value(md,element,w,path,report)
+        elif isinstance(w,AttributeScalarValue):
+            if element.get(name) is not None:
+                validate_value(md,element,w,join(path,name),report)
+        elif isinstance(w,List):
+            children=find(element,name)
+            if not children: continue
+            itemMapping=w.itemType.compile_children()
+            for i,e in enumerate(children):
+                validate_element(md,e,itemMapping,'{}[{}]'.format(join(path,name),i),report)
+        elif isinstance(w,Container):
+            children=find(element,name)
+            if not children: continue
+            if len(children)>1:
+                report.add(join(path,name),STRUCTURE,'Multiple elements found when expecting one ({})'.format(len(children)))
+                continue
+            validate_element(md,children[0],w.mapping,join(path,name),report)
+
+def validate_value(md,element,w,path,report):
+    try:
+        w.read_value(element,md)
+    except InvalidValueError as e:
+        report.add(path,VALUE,str(e))
+    except InvalidStructureError as e:
+        report.add(path,STRUCTURE,str(e))
+
+
+def join(path,segment):
+    return path+'/'+segment if path else segment
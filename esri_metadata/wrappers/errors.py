@@ -12,3 +12,18 @@ class InvalidStructureError(Exception):
 class UnboundElementError(Exception):
     """Raised when a Wrapper instance is being used in a way that it needs to be bound to an XML object but it is not."""
     pass
+
+
+class InvalidPathError(ValueError):
+    """Raised when a schema path (eg. 'dataIdInfo/idCitation/resTitle') doesn't match the schema."""
+    pass
+
+
+class ReadOnlyError(Exception):
+    """Raised when trying to save a document that was only partially loaded, or to modify a shared one."""
+    pass
+
+
+class SourceChangedError(IOError):
+    """Raised when a value left in the source file (see Metadata's lazyBinary) is used after the file has changed."""
+    pass
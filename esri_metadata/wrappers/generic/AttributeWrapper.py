@@ -3,6 +3,8 @@ from ..errors import UnboundElementError
 
 
 class AttributeWrapper(Wrapper):
+    __slots__=()
+
     def bind(self,parentElementWrapper):
         super(AttributeWrapper,self).bind(parentElementWrapper)
 
@@ -19,5 +21,9 @@ class AttributeWrapper(Wrapper):
     def create(self):
         if not self.is_bound: raise UnboundElementError('Cannot create on unbound Element')
         if self.is_missing:
+            self.check_writable()
             self.parentElementWrapper.create()
-            self.parentElementWrapper.element.set(self.name,'')
+            with self.write_lock:
+                if self.name in self.parentElementWrapper.element.keys(): return
+                self.parentElementWrapper.element.set(self.name,'')
+            self.changed()
@@ -0,0 +1,48 @@
+import threading
+
+from ... import instrumentation
+
+
+class ChildIndex(object):
+    """Lazily built tag->children lookup for the elements of one document.
+
+    An element's children are scanned once, the first time any of them is looked up. Wrappers that add or remove
+    child elements must keep the index up to date through add/remove/invalidate.
+
+    Lookups don't lock: entries are only ever replaced (never modified in place), so a reader always sees a consistent
+    tuple of children. Updates are serialised so that concurrent writers don't lose each other's changes.
+
+    document is the Metadata scans are counted against, see instrumentation."""
+    def __init__(self,document=None):
+        self.index={}
+        self.document=document
+        self.lock=threading.Lock()
+
+
+    def find(self,element,tag):
+        byTag=self.index.get(element)
+        if byTag is None:
+            if instrumentation.enabled: instrumentation.count('child_scans',1,self.document)
+            children={}
+            for e in element:
+                children.setdefault(e.tag,[]).append(e)
+            byTag=self.index.setdefault(element,dict((t,tuple(c)) for t,c in children.items()))
+        return byTag.get(tag,())
+
+
+    def add(self,parent,child):
+        with self.lock:
+            byTag=self.index.get(parent)
+            if byTag is not None:
+                byTag[child.tag]=byTag.get(child.tag,())+(child,)
+
+    def remove(self,parent,child):
+        with self.lock:
+            byTag=self.index.get(parent)
+            if byTag is not None and child.tag in byTag:
+                byTag[child.tag]=tuple(c for c in byTag[child.tag] if c is not child)
+            self.index.pop(child,None)
+
+    def invalidate(self,element):
+        with self.lock:
+            self.index.pop(element,None)
@@ -2,23 +2,39 @@ from . import ElementWrapper
 
 
 class Container(ElementWrapper):
+    __slots__=('mapping',)
+
     def __init__(self,children=None):
-        self.mapping=self.get_children() if children is None else children
-        for n,w in self.mapping.items():
-            w.set_name(n)
+        super(Container,self).__init__()
+        if children is None:
+            self.mapping=self.compile_children()
+        else:
+            self.mapping=children
+            for n,w in self.mapping.items():
+                w.set_name(n)
 
 
     def get_children(self):
         return {}
 
+    @classmethod
+    def compile_children(cls):
+        """Return the schema (name->wrapper mapping) for this class. It is built once from get_children and then shared
+        read-only by every instance, so the wrappers in it must never be bound; see Wrapper.view."""
+        mapping=cls.__dict__.get('compiledChildren')
+        if mapping is None:
+            mapping=object.__new__(cls).get_children()
+            for n,w in mapping.items():
+                w.set_name(n)
+            cls.compiledChildren=mapping
+        return mapping
+
 
     def __getattr__(self,name):
-        """If a physical attribute doesn't exist, check in self.mapping and bind the instance."""
+        """If a physical attribute doesn't exist, check in self.mapping and return a bound view of the schema node."""
         w=self.mapping.get(name,None)
         if w is not None:
-            w.set_name(name)
-            w.bind(self)
-            return w
+            return w.view(self)
         else:
             raise AttributeError('{} not found in {}'.format(name,self.name))
 
@@ -1,19 +1,20 @@
-import copy
-
 from . import Wrapper
 from ..errors import InvalidStructureError,UnboundElementError
 
 
 class ElementWrapper(Wrapper):
+    __slots__=('element',)
+
     def bind(self,parentElementWrapper):
         super(ElementWrapper,self).bind(parentElementWrapper)
-        self.element=None
+        element=None
         if not self.parentElementWrapper.is_missing:
-            for e in self.parentElementWrapper.element:
-                if e.tag==self.name:
-                    if self.element is not None:
-                        raise InvalidStructureError('Multiple elements found when expecting one')
-                    self.element=e
+            elements=self.find_children(self.parentElementWrapper.element)
+            if len(elements)>1:
+                raise InvalidStructureError('Multiple elements found when expecting one')
+            if elements:
+                element=elements[0]
+        self.element=element
 
 
     @property
@@ -28,20 +29,53 @@ class ElementWrapper(Wrapper):
     def create(self):
         if not self.is_bound: raise UnboundElementError('Cannot create on unbound Element')
         if self.is_missing:
+            self.check_writable()
             self.parentElementWrapper.create()
-            e=ET.SubElement(self.parentElementWrapper.element,self.name)
-            self.element=e
+            with self.write_lock:
+                # another view may have created the element since this one was bound
+                if self.refresh() is not None: return
+                e=self.backend.sub_element(self.parentElementWrapper.element,self.name)
+                self.index_added(self.parentElementWrapper.element,e)
+                self.element=e
+            self.changed()
 
+    def refresh(self):
+        """Find the element again (it may have been added or removed through another view), returning it."""
+        elements=self.find_children(self.parentElementWrapper.element)
+        if len(elements)>1:
+            raise InvalidStructureError('Multiple elements found when expecting one')
+        self.element=elements[0] if elements else None
+        return self.element
 
-    def set(self,elementWrapper):
+
+    def set(self,elementWrapper,move=False):
+        """Replace the element with a copy of elementWrapper's (or a Template's), or with elementWrapper's own element
+        if move."""
+        self.check_writable()
+        e=self.take_element(elementWrapper,move)
+        self.parentElementWrapper.create()
         parentNode=self.parentElementWrapper.element
-        self.delete()
-        e=copy.deepcopy(elementWrapper.element)
-        e.tag=self.name
-        parentNode.append(e)
-        self.element=e
+        with self.write_lock:
+            if self.refresh() is not None: self.delete()
+            e.tag=self.name
+            parentNode.append(e)
+            self.index_added(parentNode,e)
+            self.element=e
+        self.changed()
 
 
     def delete(self):
-        self.parentElementWrapper.element.remove(self.element)
-        self.element=None
+        self.check_writable()
+        self.parentElementWrapper.remove_child(self)
+
+    def detach(self):
+        """Remove the element from the document and return it."""
+        e=self.element
+        self.delete()
+        return e
+
+    def remove_child(self,w):
+        self.element.remove(w.element)
+        self.index_removed(self.element,w.element)
+        w.element=None
+        w.changed()
@@ -1,20 +1,20 @@
-import copy
-
-from . import Wrapper
+from . import Wrapper,Template
 from ..errors import UnboundElementError
 
 
 class List(Wrapper):
+    __slots__=('itemType','elements')
+
     def __init__(self,itemType):
+        super(List,self).__init__()
         self.itemType=itemType
 
     def bind(self,parentElementWrapper):
         super(List,self).bind(parentElementWrapper)
-        self.elements=[]
+        elements=()
         if not self.parentElementWrapper.is_missing:
-            for e in self.parentElementWrapper.element:
-                if e.tag==self.name:
-                    self.elements.append(e)
+            elements=tuple(self.find_children(self.parentElementWrapper.element))
+        self.elements=elements
 
 
     @property
@@ -30,32 +30,57 @@ class List(Wrapper):
         return len(self.elements)
 
     def __getitem__(self,i):
-        e=self.elements[i]
+        return self.item(self.elements[i])
+
+    def item(self,e):
         ew=self.itemType()
         ew.set_name(self.name)
         ew.parentElementWrapper=self
+        ew.document=self.document
         ew.element=e
         return ew
 
     def __delitem__(self,i):
-        e=self.elements[i]
+        self.check_writable()
+        self.remove_element(self.elements[i])
+
+    def remove_element(self,e):
         self.parentElementWrapper.element.remove(e)
-        del self.elements[i]
+        self.index_removed(self.parentElementWrapper.element,e)
+        self.changed('{}[{}]'.format(self.path,self.elements.index(e)))
+        self.elements=tuple(x for x in self.elements if x is not e)
+
+    def remove_child(self,w):
+        self.remove_element(w.element)
+        w.element=None
 
     def __iter__(self):
-        for i in range(0,len(self.elements)):
-            yield self.__getitem__(i)
+        # iterate over a snapshot, elements is replaced (never modified) by append/__delitem__
+        elements=self.elements
+        for e in elements:
+            yield self.item(e)
 
-    def append(self,elementWrapper=None):
+    def append(self,elementWrapper=None,move=False):
+        """Append a new item, a copy of elementWrapper (or a Template) if given or, if move, elementWrapper's own
+        element."""
         if not self.is_bound: raise UnboundElementError('Cannot create on unbound Element')
-        if self.parentElementWrapper.is_missing: self.parentElementWrapper.create()
+        self.check_writable()
         if elementWrapper is not None:
-            if not isinstance(elementWrapper,self.itemType): raise TypeError('Cannot assign {} where {} is expected'.format(elementWrapper.__class__.__name__,self.itemType.__name__))
-            e=copy.deepcopy(elementWrapper.element)
+            itemType=elementWrapper.wrapperType if isinstance(elementWrapper,Template) else elementWrapper.__class__
+            if not issubclass(itemType,self.itemType): raise TypeError('Cannot assign {} where {} is expected'.format(itemType.__name__,self.itemType.__name__))
+            e=self.take_element(elementWrapper,move)
+            if self.parentElementWrapper.is_missing: self.parentElementWrapper.create()
             # set the name of the element (it might have been called something else where it came from)
             e.tag=self.name
             self.parentElementWrapper.element.append(e)
         else:
-            e=ET.SubElement(self.parentElementWrapper.element,self.name)
-        self.elements.append(e)
-        return self[len(self.elements)-1]
+            if self.parentElementWrapper.is_missing: self.parentElementWrapper.create()
+            e=self.backend.sub_element(self.parentElementWrapper.element,self.name)
+        self.index_added(self.parentElementWrapper.element,e)
+        self.elements+=(e,)
+        item=self.item(e)
+        item.changed()
+        return item
+
+    def child_path(self,w):
+        return '{}[{}]'.format(self.path,self.elements.index(w.element))
@@ -0,0 +1,50 @@
+import itertools
+import xml.etree.ElementTree as ET
+
+
+def freeze(element,binaryPayloads,payloads=None,nodes=None):
+    """Return element as nested (tag,attrib,text,tail,children) tuples. The text of an element with a BinaryPayload (see
+    binaryPayloads) is read in, unless payloads is given: node number->(offset,length) is then added to it instead.
+    Comments and processing instructions are left out."""
+    if nodes is None: nodes=itertools.count()
+    n=next(nodes)
+    text=element.text
+    payload=binaryPayloads.get(element)
+    if payload is not None:
+        if payloads is None:
+            text=payload.read().decode('ascii')
+        else:
+            payloads[n]=(payload.offset,payload.length)
+    return (element.tag,dict(element.attrib),text,element.tail,
+            tuple(freeze(e,binaryPayloads,payloads,nodes) for e in element if isinstance(e.tag,basestring)))
+
+def thaw(node,backend,parent=None):
+    """Return a new element (under parent, if given) built from a frozen node."""
+    tag,attrib,text,tail,children=node
+    e=backend.element(tag,attrib) if parent is None else backend.sub_element(parent,tag,attrib)
+    e.text=text
+    e.tail=tail
+    for c in children:
+        thaw(c,backend,e)
+    return e
+
+
+class Template(object):
+    """A frozen copy of an element wrapper's element that can be set or appended (see ElementWrapper.set and
+    List.append) any number of times, into any document: building it again is much cheaper than a deep copy. Templates
+    can be pickled (eg. to send to worker processes) as long as their wrapper type can be."""
+    def __init__(self,elementWrapper):
+        self.wrapperType=elementWrapper.__class__
+        document=elementWrapper.document
+        self.node=freeze(elementWrapper.element,{} if document is None else document.binaryPayloads)
+
+    @classmethod
+    def from_xml(cls,xml,wrapperType):
+        """Return a template for an element serialised as xml, to be used where wrapperType is expected."""
+        t=cls.__new__(cls)
+        t.wrapperType=wrapperType
+        t.node=freeze(ET.fromstring(xml),{})
+        return t
+
+    def build(self,backend):
+        return thaw(self.node,backend)
@@ -3,10 +3,17 @@ from ..errors import UnboundElementError
 
 
 class TextWrapper(Wrapper):
+    __slots__=()
+
     def bind(self,parentElementWrapper):
         super(TextWrapper,self).bind(parentElementWrapper)
 
 
+    @property
+    def path(self):
+        # the text is recorded as its element, the form schema paths take
+        return '' if self.parentElementWrapper is None else self.parentElementWrapper.path
+
     @property
     def is_present(self):
         return self.is_bound and self.parentElementWrapper.is_present
@@ -19,4 +26,6 @@ class TextWrapper(Wrapper):
     def create(self):
         if not self.is_bound: raise UnboundElementError('Cannot create on unbound Element')
         if self.is_missing:
+            self.check_writable()
             self.parentElementWrapper.create()
+            self.changed()
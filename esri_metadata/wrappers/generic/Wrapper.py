@@ -1,4 +1,29 @@
+import threading
+
+from ...backends import get_backend
+from ... import instrumentation
+from ..errors import ReadOnlyError
+from . import Template
+
+
+# slots set by bind rather than copied by view
+BOUND_SLOTS=('parentElementWrapper','document','element','elements')
+# class->the names of the slots view copies
+VIEW_SLOTS={}
+# the write lock of wrappers that don't belong to a document
+FREE_LOCK=threading.RLock()
+
+
 class Wrapper(object):
+    # slots keep the many (short lived) views small, subclasses should declare their own (if only empty)
+    __slots__=('name','parentElementWrapper','document')
+
+    def __init__(self):
+        self.name=None
+        self.parentElementWrapper=None
+        # the Metadata instance this wrapper is bound under (None for free standing wrappers)
+        self.document=None
+
     def set_name(self,name):
         self.name=name
 
@@ -7,4 +32,91 @@ class Wrapper(object):
         return self.parentElementWrapper is not None
 
     def bind(self,parentElementWrapper):
+        # only ever called on a freshly created view (see view), a wrapper is never re-bound to another location
         self.parentElementWrapper=parentElementWrapper
+        self.document=parentElementWrapper.document
+        if instrumentation.enabled: instrumentation.count('binds',1,self.document)
+
+    def view(self,parentElementWrapper):
+        """Return a copy of this (schema) wrapper bound under parentElementWrapper. The schema wrapper is left untouched."""
+        cls=self.__class__
+        w=object.__new__(cls)
+        names=VIEW_SLOTS.get(cls)
+        if names is None:
+            names=VIEW_SLOTS[cls]=tuple(n for c in cls.__mro__ for n in c.__dict__.get('__slots__',()) if n not in BOUND_SLOTS)
+        for n in names:
+            setattr(w,n,getattr(self,n))
+        # subclasses without slots
+        if cls.__dictoffset__: w.__dict__.update(self.__dict__)
+        w.bind(parentElementWrapper)
+        return w
+
+
+    @property
+    def backend(self):
+        return get_backend() if self.document is None else self.document.backend
+
+    @property
+    def write_lock(self):
+        return FREE_LOCK if self.document is None else self.document.writeLock
+
+    @property
+    def path(self):
+        """The schema path of this wrapper from the document root, eg. 'dataIdInfo/tpCat[1]/TopicCatCd'."""
+        parent=self.parentElementWrapper
+        if parent is None or parent is self: return ''
+        return parent.child_path(self)
+
+    def child_path(self,w):
+        path=self.path
+        return path+'/'+w.name if path else w.name
+
+    def check_writable(self):
+        if self.document is not None and self.document.shared:
+            raise ReadOnlyError('Cannot modify a shared Metadata, modify a copy instead')
+
+    def changed(self,path=None):
+        """Record a modification (of this wrapper, or path) with the document."""
+        if self.document is not None: self.document.mark_changed(self.path if path is None else path)
+
+
+    def take_element(self,source,move=False):
+        """Return an element for source (an element wrapper or a Template) to add under this wrapper: a clone of a
+        template, source's own element (removed from where it was) if move, otherwise a copy."""
+        if isinstance(source,Template):
+            return source.build(self.backend)
+        document=source.document
+        # elements of another backend can only be copied
+        moved=move and self.backend.is_element(source.element)
+        if moved:
+            e=source.detach()
+            pairs=((c,c) for c in e.iter())
+        else:
+            e=self.backend.copy(source.element)
+            pairs=zip(source.element.iter(),e.iter())
+        # binary payloads left in the source file go with the element
+        if document is not None and document.binaryPayloads and (document is not self.document or not moved):
+            for old,new in pairs:
+                payload=document.binaryPayloads.get(old)
+                if payload is None: continue
+                if moved: del document.binaryPayloads[old]
+                if self.document is not None: self.document.binaryPayloads[new]=payload
+        return e
+
+
+    def find_children(self,element):
+        """Return the child elements of element whose tag matches this wrapper's name."""
+        if self.document is None:
+            return [e for e in element if e.tag==self.name]
+        return self.document.childIndex.find(element,self.name)
+
+    def index_added(self,parent,child):
+        if self.document is not None:
+            self.document.childIndex.add(parent,child)
+            self.document.valueCache.pop(parent,None)
+
+    def index_removed(self,parent,child):
+        if self.document is not None:
+            self.document.childIndex.remove(parent,child)
+            self.document.valueCache.pop(parent,None)
+            self.document.valueCache.pop(child,None)
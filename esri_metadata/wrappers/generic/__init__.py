@@ -1,8 +1,10 @@
+from .Template import Template
 from .Wrapper import Wrapper
 
 from .ElementWrapper import ElementWrapper
 from .Container import Container
 from .List import List
+from .ChildIndex import ChildIndex
 
 from .TextWrapper import TextWrapper
 from .AttributeWrapper import AttributeWrapper
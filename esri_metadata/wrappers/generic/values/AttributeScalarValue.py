@@ -1,12 +1,40 @@
 from .. import AttributeWrapper
+from .... import instrumentation
 
 
 class AttributeScalarValue(AttributeWrapper):
+    __slots__=()
+
     @property
     def value(self):
-        return self.parse_value(self.parentElementWrapper.element.get(self.name))
+        return self.read_value(self.parentElementWrapper.element,self.document)
 
     @value.setter
     def value(self,v):
+        self.check_writable()
+        text=self.format_value(v)
+        e=self.parentElementWrapper.element
+        if e is not None and e.get(self.name)==text: return
         self.parentElementWrapper.create()
-        e=self.parentElementWrapper.element.set(self.name,self.format_value(v))
+        self.parentElementWrapper.element.set(self.name,text)
+        if self.document is not None: self.document.valueCache.pop(self.parentElementWrapper.element,None)
+        self.changed()
+
+
+    def read_value(self,element,document=None):
+        """Parse the value held by element (the element this attribute belongs to) in document. Parsed values are cached
+        in the document until the element is modified."""
+        raw=element.get(self.name)
+        if document is None or raw is None:
+            if instrumentation.enabled: instrumentation.count('value_parses',1,document)
+            return self.parse_value(raw)
+        key=(self.__class__,self.name)
+        cached=document.valueCache.setdefault(element,{})
+        c=cached.get(key)
+        if c is not None and c[0]==raw:
+            if instrumentation.enabled: instrumentation.count('value_cache_hits',1,document)
+            return c[1]
+        if instrumentation.enabled: instrumentation.count('value_parses',1,document)
+        v=self.parse_value(raw)
+        cached[key]=(raw,v)
+        return v
@@ -1,4 +1,4 @@
 from . import AttributeScalarValue,StringValue
 
 
-class AttributeStringValue(AttributeScalarValue,StringValue): pass
+class AttributeStringValue(AttributeScalarValue,StringValue): __slots__=()
@@ -0,0 +1,78 @@
+import base64
+import binascii
+import os
+
+from . import ScalarValue
+from ...errors import InvalidValueError,SourceChangedError
+
+
+def file_validators(path):
+    """Return the modification time and size of the file at path, what a payload left in it is checked against."""
+    st=os.stat(path)
+    return (st.st_mtime,st.st_size)
+
+def decode_base64(v):
+    try:
+        return base64.b64decode(v)
+    except (TypeError,ValueError,binascii.Error) as e:
+        raise InvalidValueError('Invalid BinaryValue: {}'.format(e))
+
+
+class BinaryValue(ScalarValue):
+    """Base64 encoded binary data, the value is the decoded bytes."""
+    __slots__=()
+
+    def parse_value(self,v):
+        return decode_base64(v) if v else None
+
+    def format_value(self,v):
+        return base64.b64encode(v).decode('ascii')
+
+
+class BinaryPayload(object):
+    """The (base64) text of an element left in the source file, as a byte offset and length, so that it is only read
+    (and decoded) when it is actually used. validators are the file's (mtime,size) when the offset was taken (default:
+    now), reading raises SourceChangedError once they no longer match."""
+    CHUNK_SIZE=1<<16
+
+    def __init__(self,path,offset,length,validators=None):
+        self.path=path
+        self.offset=offset
+        self.length=length
+        self.validators=file_validators(path) if validators is None else tuple(validators)
+
+    def check(self):
+        try:
+            validators=file_validators(self.path)
+        except OSError:
+            validators=None
+        if validators!=self.validators:
+            raise SourceChangedError('The source file has changed since it was loaded: {}'.format(self.path))
+
+    def chunks(self):
+        self.check()
+        with open(self.path,'rb') as fin:
+            fin.seek(self.offset)
+            remaining=self.length
+            while remaining>0:
+                c=fin.read(min(self.CHUNK_SIZE,remaining))
+                if not c: raise IOError('Binary payload truncated in {}'.format(self.path))
+                remaining-=len(c)
+                yield c
+
+    def read(self):
+        return b''.join(self.chunks())
+
+    def decode(self):
+        return decode_base64(self.read())
+
+    def write_decoded(self,fileobj):
+        """Decode the payload to fileobj a chunk at a time."""
+        rest=b''
+        for c in self.chunks():
+            # strip the line breaks and decode whole 4 character groups only
+            c=rest+b''.join(c.split())
+            n=len(c)//4*4
+            fileobj.write(decode_base64(c[:n]))
+            rest=c[n:]
+        if rest: fileobj.write(decode_base64(rest))
@@ -3,6 +3,7 @@ from ...errors import InvalidValueError
 
 
 class BooleanValueBaseClass(ScalarValue):
+    __slots__=()
     CHOICES=[]
 
     def parse_value(self,v):
@@ -15,4 +16,5 @@ class BooleanValueBaseClass(ScalarValue):
 
 
 class BooleanTitleCaseValue(BooleanValueBaseClass):
+    __slots__=()
     CHOICES=['False','True']
@@ -5,24 +5,52 @@ from ...errors import InvalidValueError
 
 
 class DateTimeValueBaseClass(ScalarValue):
+    __slots__=()
     FORMAT=''
 
     def parse_value(self,v):
         try:
-            r=datetime.datetime.strptime(v.strip(),self.FORMAT) if v else None
+            if v:
+                v=v.strip()
+                r=self.parse_fixed(v)
+                if r is None: r=datetime.datetime.strptime(v,self.FORMAT)
+            else:
+                r=None
         except ValueError as e:
             raise InvalidValueError('Invalid {}: {}'.format(self.__class__.__name__,v))
         return r
 
+    def parse_fixed(self,v):
+        """Parse v if it's exactly in the (fixed width) FORMAT, much faster than strptime. Returns None to fall back to
+        strptime for anything else (which will usually be an invalid value anyway)."""
+        return None
+
     def format_value(self,v):
         return datetime.datetime.strftime(v,self.FORMAT)
 
 
 class DateValue(DateTimeValueBaseClass):
+    __slots__=()
     FORMAT='%Y%m%d'
 
+    def parse_fixed(self,v):
+        if len(v)==8 and v.isdigit():
+            return datetime.datetime(int(v[0:4]),int(v[4:6]),int(v[6:8]))
+
 class TimeValue(DateTimeValueBaseClass):
+    __slots__=()
     FORMAT='%H%M%S'
 
+    def parse_fixed(self,v):
+        if len(v)==6 and v.isdigit():
+            return datetime.datetime(1900,1,1,int(v[0:2]),int(v[2:4]),int(v[4:6]))
+
 class DateTimeValue(DateTimeValueBaseClass):
+    __slots__=()
     FORMAT='%Y-%m-%dT%H:%M:%S'
+
+    def parse_fixed(self,v):
+        if len(v)==19 and v[4]==v[7]=='-' and v[10]=='T' and v[13]==v[16]==':':
+            digits=v[0:4]+v[5:7]+v[8:10]+v[11:13]+v[14:16]+v[17:19]
+            if digits.isdigit():
+                return datetime.datetime(int(v[0:4]),int(v[5:7]),int(v[8:10]),int(v[11:13]),int(v[14:16]),int(v[17:19]))
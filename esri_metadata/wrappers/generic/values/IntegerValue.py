@@ -3,10 +3,12 @@ from ...errors import InvalidValueError
 
 
 class IntegerValue(ScalarValue):
+    __slots__=()
+
     def parse_value(self,v):
         try:
             r=int(v)
-        except ValueError as e:
+        except (TypeError,ValueError) as e:
             raise InvalidValueError('Invalid IntegerValue: {}'.format(v))
         return r
 
@@ -1,6 +1,8 @@
 
 
 class ScalarValue(object):
+    __slots__=()
+
     def parse_value(self,v):
         raise NotImplemented()
 
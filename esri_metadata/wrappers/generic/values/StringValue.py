@@ -2,6 +2,8 @@ from . import ScalarValue
 
 
 class StringValue(ScalarValue):
+    __slots__=()
+
     def parse_value(self,v):
         return v
 
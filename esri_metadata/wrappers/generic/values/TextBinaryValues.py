@@ -0,0 +1,35 @@
+from . import TextScalarValue,TextContainer,BinaryValue
+
+
+class TextBinaryValue(TextScalarValue,BinaryValue):
+    """Binary value whose text may have been left in the source file when the document was loaded (see
+    Metadata.load_from_xml), in which case it is only read when the value is used."""
+    __slots__=()
+
+    @TextScalarValue.value.setter
+    def value(self,v):
+        TextScalarValue.value.fset(self,v)
+        if self.document is not None: self.document.binaryPayloads.pop(self.parentElementWrapper.element,None)
+
+    def read_value(self,element,document=None):
+        payload=None if document is None else document.binaryPayloads.get(element)
+        if payload is not None:
+            return payload.decode()
+        return super(TextBinaryValue,self).read_value(element,document)
+
+
+    def write_to(self,fileobj):
+        """Write the decoded value to fileobj, streaming it from the source file if it was left there."""
+        if self.parentElementWrapper.is_missing: return
+        element=self.parentElementWrapper.element
+        payload=None if self.document is None else self.document.binaryPayloads.get(element)
+        if payload is not None:
+            payload.write_decoded(fileobj)
+        else:
+            v=self.read_value(element,self.document)
+            if v: fileobj.write(v)
+
+
+class TextBinaryValueContainer(TextContainer):
+    __slots__=()
+    CLASS=TextBinaryValue
@@ -1,8 +1,9 @@
 from . import TextScalarValue,TextContainer,BooleanTitleCaseValue
 
 
-class TextBooleanTitleCaseValue(TextScalarValue,BooleanTitleCaseValue): pass
+class TextBooleanTitleCaseValue(TextScalarValue,BooleanTitleCaseValue): __slots__=()
 
 
 class TextBooleanTitleCaseValueContainer(TextContainer):
+    __slots__=()
     CLASS=TextBooleanTitleCaseValue
@@ -2,7 +2,18 @@ from .. import Container
 
 
 class TextContainer(Container):
+    __slots__=()
     CLASS=None
 
     def get_children(self):
         return {'text':self.CLASS()}
+
+
+    # shortcut to the text value, ie. container.value instead of container.text.value
+    @property
+    def value(self):
+        return self.text.value
+
+    @value.setter
+    def value(self,v):
+        self.text.value=v
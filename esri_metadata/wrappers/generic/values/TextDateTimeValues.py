@@ -1,16 +1,19 @@
 from . import TextScalarValue,TextContainer,DateValue,TimeValue,DateTimeValue
 
 
-class TextDateValue(TextScalarValue,DateValue): pass
-class TextTimeValue(TextScalarValue,TimeValue): pass
-class TextDateTimeValue(TextScalarValue,DateTimeValue): pass
+class TextDateValue(TextScalarValue,DateValue): __slots__=()
+class TextTimeValue(TextScalarValue,TimeValue): __slots__=()
+class TextDateTimeValue(TextScalarValue,DateTimeValue): __slots__=()
 
 
 class TextDateValueContainer(TextContainer):
+    __slots__=()
     CLASS=TextDateValue
 
 class TextTimeValueContainer(TextContainer):
+    __slots__=()
     CLASS=TextTimeValue
 
 class TextDateTimeValueContainer(TextContainer):
+    __slots__=()
     CLASS=TextDateTimeValue
@@ -1,8 +1,9 @@
 from . import TextScalarValue,TextContainer,IntegerValue
 
 
-class TextIntegerValue(TextScalarValue,IntegerValue): pass
+class TextIntegerValue(TextScalarValue,IntegerValue): __slots__=()
 
 
 class TextIntegerValueContainer(TextContainer):
+    __slots__=()
     CLASS=TextIntegerValue
@@ -1,22 +1,51 @@
 from .. import TextWrapper
 from ...errors import InvalidStructureError
+from .... import instrumentation
 
 
 class TextScalarValue(TextWrapper):# TODO: also ScalarValue here?
+    __slots__=()
+
     @property
     def value(self):
         if self.parentElementWrapper.is_missing:
             return None
-        elif len(self.parentElementWrapper.element)>0:
-            raise InvalidStructureError('Greater than one child node for type: {}'.format(self.__class__.__name__))
-        v=self.parentElementWrapper.element.text
-        return self.parse_value(v)
+        return self.read_value(self.parentElementWrapper.element,self.document)
 
     @value.setter
     def value(self,v):
+        self.check_writable()
+        text=self.format_value(v)
+        e=self.parentElementWrapper.element
+        if e is not None and e.text==text and len(e)==0 and (self.document is None or e not in self.document.binaryPayloads):
+            # setting the same value again isn't a modification
+            return
         self.parentElementWrapper.create()
         e=self.parentElementWrapper.element
-        e.text=self.format_value(v)
+        e.text=text
         # just remove any child elements in case, because this is supposed to be a scalar value
-        for n in e:
+        for n in list(e):
             e.remove(n)
+        if self.document is not None:
+            self.document.childIndex.invalidate(e)
+            self.document.valueCache.pop(e,None)
+        self.changed()
+
+
+    def read_value(self,element,document=None):
+        """Parse the value held by element (the element this text belongs to) in document. Parsed values are cached in
+        the document until the element is modified."""
+        if document is not None:
+            cached=document.valueCache.get(element)
+            if cached is not None:
+                raw,v=cached.get(self.__class__,(None,None))
+                if raw is not None and raw==element.text:
+                    if instrumentation.enabled: instrumentation.count('value_cache_hits',1,document)
+                    return v
+        if len(element)>0:
+            raise InvalidStructureError('Greater than one child node for type: {}'.format(self.__class__.__name__))
+        if instrumentation.enabled: instrumentation.count('value_parses',1,document)
+        v=self.parse_value(element.text)
+        if document is not None and element.text is not None:
+            document.valueCache.setdefault(element,{})[self.__class__]=(element.text,v)
+        return v
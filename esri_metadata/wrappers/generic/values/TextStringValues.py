@@ -1,8 +1,9 @@
 from . import TextScalarValue,TextContainer,StringValue
 
 
-class TextStringValue(TextScalarValue,StringValue): pass
+class TextStringValue(TextScalarValue,StringValue): __slots__=()
 
 
 class TextStringValueContainer(TextContainer):
+    __slots__=()
     CLASS=TextStringValue
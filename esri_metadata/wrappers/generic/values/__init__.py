@@ -5,6 +5,7 @@ from .StringValue import StringValue
 from .IntegerValue import IntegerValue
 from .DateTimeValues import DateValue,TimeValue,DateTimeValue
 from .BooleanValues import BooleanTitleCaseValue
+from .BinaryValues import BinaryValue,BinaryPayload
 
 # text wrappers
 from .TextScalarValue import TextScalarValue
@@ -13,6 +14,7 @@ from .TextStringValues import TextStringValue,TextStringValueContainer
 from .TextIntegerValues import TextIntegerValue,TextIntegerValueContainer
 from .TextDateTimeValues import TextDateValue,TextTimeValue,TextDateTimeValue,TextDateValueContainer,TextTimeValueContainer,TextDateTimeValueContainer
 from .TextBooleanValues import TextBooleanTitleCaseValue,TextBooleanTitleCaseValueContainer
+from .TextBinaryValues import TextBinaryValue,TextBinaryValueContainer
 
 # attribute wrappers
 from .AttributeScalarValue import AttributeScalarValue
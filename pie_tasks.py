@@ -25,6 +25,12 @@ def test():
         cmd(r'python -m pytest -s tests')
 
 
+@task
+def benchmark():
+    with venv(r'venvs\test'):
+        cmd(r'python benchmarks\run.py')
+
+
 @task
 def register():
     cmd(r'python setup.py register')
@@ -0,0 +1,125 @@
+import datetime
+import io
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata
+from esri_metadata.backends import to_string
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+
+
+@pytest.fixture(params=['etree','lxml'])
+def backend(request):
+    if request.param=='lxml': pytest.importorskip('lxml')
+    return request.param
+
+@pytest.fixture
+def md(request,backend):
+    return Metadata(str(DATA_DIR/'full_labelled.xml'),backend=backend)
+
+@pytest.fixture
+def temp_path(request):
+    return str(DATA_DIR/'temp.xml')
+
+
+# tests
+def test_read(md):
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.dataIdInfo.idCitation.date.pubDate.value==datetime.datetime(2016,9,1)
+    assert md.get('dataIdInfo/tpCat[*]/TopicCatCd/value')==['008','015']
+    assert md.Binary.Thumbnail.Data.value.startswith(b'\xff\xd8')
+
+
+def test_edit_and_save(md,backend,temp_path):
+    md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.value='City'
+    md.dataIdInfo.idCitation.citRespParty.append(md.dataIdInfo.idPoC)
+    # elements can be copied between documents using different backends
+    md.dataIdInfo.idCitation.citRespParty.append(Metadata(str(DATA_DIR/'full_labelled.xml')).dataIdInfo.idPoC)
+    thumbnail=md.Binary.Thumbnail.Data.value
+    md.save(temp_path)
+
+    for b in set([backend,'etree']):
+        saved=Metadata(temp_path,backend=b)
+        assert saved.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.value=='City'
+        assert [c.rpIndName.value for c in saved.dataIdInfo.idCitation.citRespParty]==['Contact1 Name','Contact2 Name','Points of Contact1 Name','Points of Contact1 Name']
+        assert saved.Binary.Thumbnail.Data.value==thumbnail
+        assert saved.tree.getroot().get('{http://www.w3.org/XML/1998/namespace}lang')=='en'
+
+
+def test_save_lazy_binary(backend,tmpdir,monkeypatch):
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),backend=backend,lazyBinary=True)
+    element=md.Binary.Thumbnail.Data.element
+    write=md.backend.write
+    def check_write(tree,target):
+        # the payload markers are only written to a copy
+        assert element.text is None
+        write(tree,target)
+    monkeypatch.setattr(md.backend,'write',check_write)
+    path=str(tmpdir.join('lazy.xml'))
+    md.save(path)
+    assert element.text is None
+    assert Metadata(path,backend=backend).Binary.Thumbnail.Data.value==Metadata(str(DATA_DIR/'full_labelled.xml')).Binary.Thumbnail.Data.value
+    assert Metadata(path).dataIdInfo.idCitation.resTitle.value=='Title'
+
+
+def test_move_between_backends(backend):
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),lazyBinary=True)
+    thumbnail=Metadata(str(DATA_DIR/'full_labelled.xml')).Binary.Thumbnail.Data.value
+    other=Metadata(str(DATA_DIR/'empty.xml'),backend=backend)
+    other.Binary.set(md.Binary,move=True)
+    assert other.Binary.Thumbnail.Data.value==thumbnail
+    # an element from another backend is copied, leaving the source (and its payload) where it was
+    moved=backend=='etree'
+    assert md.Binary.is_missing==moved and bool(md.binaryPayloads)!=moved
+    if not moved: assert md.Binary.Thumbnail.Data.value==thumbnail
+
+
+@pytest.mark.parametrize('lazyBinary',[False,True])
+def test_round_trip(tmpdir,lazyBinary):
+    pytest.importorskip('lxml')
+    with open(str(DATA_DIR/'full_labelled.xml'),'rb') as f: xml=f.read()
+    source=tmpdir.join('source.xml')
+    source.write_binary(b'<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE metadata>\n<?xml-stylesheet href="style.xsl"?>\n<!-- comment -->\n'+xml)
+    saved={}
+    for b in ('etree','lxml'):
+        md=Metadata(str(source),backend=b,lazyBinary=lazyBinary)
+        md.dataIdInfo.idCitation.resTitle.value='New Title'
+        path=str(tmpdir.join(b+'.xml'))
+        md.save(path)
+        saved[b]=Metadata(path).tree.getroot()
+        if b=='lxml':
+            with open(path,'rb') as f: written=f.read()
+            # lxml keeps everything outside the root element
+            assert written.startswith(b"<?xml version='1.0' encoding='UTF-8'?>\n<!DOCTYPE metadata>\n<?xml-stylesheet href=\"style.xsl\"?><!-- comment --><metadata")
+    # and both write the same document
+    assert Metadata(str(tmpdir.join('lxml.xml'))).get('dataIdInfo/idCitation/resTitle')=='New Title'
+    assert to_string(saved['etree'])==to_string(saved['lxml'])
+
+
+def test_load_paths(backend):
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),paths=['dataIdInfo/idCitation/resTitle'],backend=backend)
+    assert md.get('dataIdInfo/idCitation/resTitle')=='Title'
+    assert md.Binary.is_missing
+
+
+def test_load_paths_discards(backend,monkeypatch):
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),backend=backend)
+    iterparse=md.backend.iterparse
+    ended=[]
+    def check_iterparse(source,events):
+        for event,e in iterparse(source,events):
+            if event=='end' and e.tag in ('eainfo','detailed'):
+                # the discarded children of a discarded element are gone by the time it ends
+                assert len(e)==0
+                ended.append(e.tag)
+            yield event,e
+    monkeypatch.setattr(md.backend,'iterparse',check_iterparse)
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),paths=['dataIdInfo/idCitation/resTitle'],backend=backend)
+    assert ended==['detailed','eainfo']
+    assert md.get('dataIdInfo/idCitation/resTitle')=='Title'
+    assert md.eainfo.is_missing
+
+
+def test_xpath(md):
+    assert [e.get('value') for e in md.xpath('dataIdInfo/tpCat/TopicCatCd')]==['008','015']
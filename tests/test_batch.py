@@ -0,0 +1,43 @@
+import datetime
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata,batch
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+PATHS=[str(DATA_DIR/n) for n in ('full_labelled.xml','empty.xml','invalid_data.xml')]
+
+
+def read_dates(md):
+    return (md.get('Esri/ModDate'),md.get('Esri/CreaDate'))
+
+
+# tests
+@pytest.mark.parametrize('workers',[0,2])
+def test_process(workers):
+    if workers: pytest.importorskip('concurrent.futures')
+    progress=[]
+    results=list(batch.process(PATHS,read_dates,workers=workers,chunkSize=2,progress=lambda n,r:progress.append(n)))
+    assert [r.datasetPath for r in results]==PATHS
+    assert results[0].ok and results[0].value[0].year==2016
+    assert results[1].ok and results[1].value==(None,datetime.datetime(2016,9,1))
+    # invalid values are captured against the item
+    assert isinstance(results[2].error,Metadata.InvalidValueError)
+    assert progress==[1,2,3]
+
+
+def test_process_malformed(tmpdir):
+    path=str(tmpdir.join('malformed.xml'))
+    with open(path,'wb') as fout:
+        fout.write(b'<metadata><Esri><ModDate>20160902</ModDate></metadata>')
+    results=list(batch.process([path]+PATHS[:2],read_dates,workers=0))
+    # the malformed file doesn't stop the rest of the batch
+    assert isinstance(results[0].error,SyntaxError)
+    assert results[1].ok and results[2].ok
+
+
+def test_process_unordered():
+    pytest.importorskip('concurrent.futures')
+    results=list(batch.process(PATHS*3,read_dates,workers=2,ordered=False))
+    assert sorted(r.datasetPath for r in results)==sorted(PATHS*3)
+    assert len([r for r in results if not r.ok])==3
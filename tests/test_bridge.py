@@ -0,0 +1,50 @@
+import os
+import shutil
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata
+from esri_metadata.bridge import LocalBridge
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+DATASETS=[r'connection.sde\Metadata_Test',r'connection.sde\Other']
+
+
+@pytest.fixture
+def bridge(request,tmpdir):
+    b=LocalBridge(str(tmpdir.mkdir('store')),str(tmpdir.mkdir('scratch')))
+    for d in DATASETS:
+        shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),b.store_path(d))
+    return b
+
+
+# tests
+def test_load_save(bridge):
+    md=Metadata(DATASETS[0],bridge=bridge)
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.Binary.Thumbnail.Data.value.startswith(b'\xff\xd8')
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    md.save()
+    assert Metadata(DATASETS[0],bridge=bridge).dataIdInfo.idCitation.resTitle.value=='New Title'
+    # scratch files are cleaned up
+    assert os.listdir(bridge.scratchDir)==[]
+
+
+def test_load_save_many(bridge):
+    paths=DATASETS+[str(DATA_DIR/'empty.xml')]
+    mds=Metadata.load_many(paths,bridge=bridge)
+    assert bridge.exports==1
+    assert [md.get('dataIdInfo/idCitation/resTitle') for md in mds]==['Title','Title',None]
+    for md in mds[:2]: md.dataIdInfo.idCitation.resTitle.value=md.datasetPath
+    Metadata.save_many(mds[:2],bridge=bridge)
+    assert bridge.imports==1
+    assert [md.get('dataIdInfo/idCitation/resTitle') for md in Metadata.load_many(DATASETS,bridge=bridge)]==DATASETS
+    assert os.listdir(bridge.scratchDir)==[]
+
+
+def test_owned_scratch_dir(tmpdir):
+    with LocalBridge(str(tmpdir)) as b:
+        Metadata('missing_dataset',bridge=b)
+        scratchDir=b.scratchDir
+        assert os.path.isdir(scratchDir)
+    assert not os.path.exists(scratchDir)
@@ -0,0 +1,147 @@
+import os
+import shutil
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata
+from esri_metadata.cache import ParseCache,MetadataCache
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+
+
+@pytest.fixture
+def xmlPath(tmpdir):
+    p=str(tmpdir.join('metadata.xml'))
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),p)
+    return p
+
+
+# tests
+@pytest.mark.parametrize('backend',['etree','lxml'])
+def test_load_from_cache(tmpdir,xmlPath,backend):
+    if backend=='lxml': pytest.importorskip('lxml')
+    cache=ParseCache(str(tmpdir.join('cache')))
+    original=Metadata(xmlPath,parseCache=cache,backend=backend,lazyBinary=True)
+    assert (cache.hits,cache.misses)==(0,1)
+    md=Metadata(xmlPath,parseCache=cache,backend=backend,lazyBinary=True)
+    assert (cache.hits,cache.misses)==(1,1)
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.tree.getroot().attrib==original.tree.getroot().attrib
+    # the thumbnail is still read from the source file
+    assert list(md.binaryPayloads.values())[0].offset==list(original.binaryPayloads.values())[0].offset
+    assert md.Binary.Thumbnail.Data.value==original.Binary.Thumbnail.Data.value
+    # unless lazyBinary isn't used
+    md=Metadata(xmlPath,parseCache=cache,backend=backend)
+    assert not md.binaryPayloads and md.Binary.Thumbnail.Data.value==original.Binary.Thumbnail.Data.value
+    assert cache.hits==2
+    # partial loads use the cached tree
+    assert Metadata(xmlPath,paths=['Esri/ModDate'],parseCache=cache).get('Esri/ModDate').day==2
+    assert cache.hits==3
+
+
+def test_changed_file_is_parsed(tmpdir,xmlPath):
+    cache=ParseCache(str(tmpdir.join('cache')),useHash=True)
+    md=Metadata(xmlPath,parseCache=cache)
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    md.save()
+    assert Metadata(xmlPath,parseCache=cache).dataIdInfo.idCitation.resTitle.value=='New Title'
+    assert (cache.hits,cache.misses)==(0,2)
+
+
+def test_changed_while_parsing(tmpdir,xmlPath,monkeypatch):
+    cache=ParseCache(str(tmpdir.join('cache')))
+    parse_xml=Metadata.parse_xml
+    def parse_then_change(md,path,lazyBinary):
+        parse_xml(md,path,lazyBinary)
+        with open(path,'rb') as fin:
+            data=fin.read()
+        with open(path,'wb') as fout:
+            fout.write(data.replace(b'<resTitle>Title</resTitle>',b'<resTitle>Changed Title</resTitle>'))
+    monkeypatch.setattr(Metadata,'parse_xml',parse_then_change)
+    assert Metadata(xmlPath,parseCache=cache).dataIdInfo.idCitation.resTitle.value=='Title'
+    monkeypatch.undo()
+    # the stale tree was stored under the validators from before the change
+    assert Metadata(xmlPath,parseCache=cache).dataIdInfo.idCitation.resTitle.value=='Changed Title'
+    assert (cache.hits,cache.misses)==(0,2)
+
+
+def test_corrupt_entry(tmpdir,xmlPath):
+    cache=ParseCache(str(tmpdir.join('cache')))
+    Metadata(xmlPath,parseCache=cache)
+    with open(cache.entry_path(xmlPath),'wb') as fout:
+        fout.write(b'\x00garbage')
+    assert Metadata(xmlPath,parseCache=cache).dataIdInfo.idCitation.resTitle.value=='Title'
+    assert cache.misses==2
+
+
+def test_evict(tmpdir):
+    cache=ParseCache(str(tmpdir.join('cache')),maxEntries=2)
+    paths=[]
+    for i in range(3):
+        paths.append(str(tmpdir.join('{}.xml'.format(i))))
+        shutil.copyfile(str(DATA_DIR/'empty.xml'),paths[-1])
+        Metadata(paths[-1],parseCache=cache)
+        # entries are ordered by modification time
+        os.utime(cache.entry_path(paths[-1]),(i,i))
+    assert [os.path.exists(cache.entry_path(p)) for p in paths]==[False,True,True]
+
+
+def test_memory_cache_shared(xmlPath):
+    cache=MetadataCache()
+    md=cache.get(xmlPath)
+    assert cache.get(xmlPath) is md
+    assert (cache.hits,cache.misses)==(1,1)
+    # shared documents can't be modified
+    with pytest.raises(Metadata.ReadOnlyError):
+        md.dataIdInfo.idCitation.resTitle.value='New Title'
+    with pytest.raises(Metadata.ReadOnlyError):
+        md.mdConst.append()
+    del md.dataIdInfo.idCitation.citRespParty[0].rpCntInfo.cntAddress.element.attrib['addressType']
+    with pytest.raises(Metadata.ReadOnlyError):
+        md.dataIdInfo.idCitation.citRespParty[0].rpCntInfo.cntAddress.addressType.create()
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+
+
+def test_memory_cache_edit(xmlPath):
+    cache=MetadataCache()
+    shared=cache.get(xmlPath)
+    md=cache.edit(xmlPath)
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    assert shared.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.Binary.Thumbnail.Data.value==shared.Binary.Thumbnail.Data.value
+    md.save()
+    # written through to the cache
+    assert cache.get(xmlPath).dataIdInfo.idCitation.resTitle.value=='New Title'
+    assert cache.misses==1
+    assert Metadata(xmlPath).dataIdInfo.idCitation.resTitle.value=='New Title'
+
+
+def test_memory_cache_invalidation(tmpdir,xmlPath):
+    now=[0]
+    cache=MetadataCache(ttl=10)
+    cache.clock=lambda: now[0]
+    md=cache.get(xmlPath)
+    now[0]=5
+    assert cache.get(xmlPath) is md
+    now[0]=20
+    assert cache.get(xmlPath) is not md
+    # the file changing
+    md=cache.get(xmlPath)
+    edited=Metadata(xmlPath)
+    edited.dataIdInfo.idCitation.resTitle.value='Changed Title'
+    edited.save()
+    assert cache.get(xmlPath).dataIdInfo.idCitation.resTitle.value=='Changed Title'
+
+
+def test_memory_cache_limits(tmpdir):
+    paths=[]
+    for i in range(3):
+        paths.append(str(tmpdir.join('{}.xml'.format(i))))
+        shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),paths[-1])
+    cache=MetadataCache(maxEntries=2)
+    for p in paths: cache.get(p)
+    assert paths[0] not in cache and len(cache)==2
+
+    cache=MetadataCache(maxBytes=1)
+    cache.get(paths[0])
+    assert len(cache)==0 and cache.size==0
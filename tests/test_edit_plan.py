@@ -0,0 +1,132 @@
+import datetime
+import pickle
+import shutil
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata,batch
+from esri_metadata.EditPlan import EditPlan
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+
+
+@pytest.fixture
+def template(request):
+    return Metadata(str(DATA_DIR/'full_labelled.xml'))
+
+@pytest.fixture
+def md(request):
+    return Metadata(str(DATA_DIR/'empty.xml'))
+
+
+# tests
+def test_set_values(md):
+    plan=EditPlan.from_dict({
+        'Esri/scaleRange/minScale':150000000,
+        'Esri/scaleRange/maxScale':5000,
+        'Esri/ModDate':datetime.datetime(2017,1,2),
+        'dataIdInfo/idCitation/resTitle':'Title',
+        'dataIdInfo/idCitation/citRespParty[*]/rpIndName':'Nobody',
+    })
+    plan=pickle.loads(pickle.dumps(plan))
+    plan.apply(md)
+    assert md.Esri.scaleRange.minScale.value==150000000
+    assert md.Esri.ModDate.value==datetime.datetime(2017,1,2)
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    # [*] only sets existing items
+    assert len(md.dataIdInfo.idCitation.citRespParty)==0
+    assert 'Esri/scaleRange/minScale' in md.changed_paths and 'dataIdInfo' in md.changed_paths
+    # the elements created are indexed
+    assert len(md.childIndex.find(md.element,'Esri'))==1
+
+
+def test_copy_from_template(template,md):
+    plan=EditPlan.from_metadata(template,['mdConst','dataIdInfo/idPoC','dataIdInfo/resMaint/maintCont','Esri/scaleRange'])
+    plan.apply(md)
+    plan.apply(template)
+    for m in (md,template):
+        assert m.dataIdInfo.idPoC.rpIndName.value=='Points of Contact1 Name'
+        assert m.dataIdInfo.resMaint.maintCont[0].rpIndName.value=='Maintenance Contact1 Name'
+        assert m.Esri.scaleRange.maxScale.value==5000
+    assert len(md.mdConst)==len(template.mdConst)
+    assert len(template.dataIdInfo.resMaint.maintCont)==1
+
+
+def test_copy_values_from_template(template,md):
+    with pytest.raises(Metadata.InvalidPathError):
+        EditPlan.from_metadata(template,['dataIdInfo/tpCat[*]/TopicCatCd/value'])
+    with pytest.raises(Metadata.InvalidPathError):
+        EditPlan.from_metadata(template,['dataIdInfo/themeKeys[*]/keyword'])
+    with pytest.raises(Metadata.InvalidPathError):
+        EditPlan.from_metadata(template,['dataIdInfo/tpCat[*]/TopicCatCd'])
+    # values the template doesn't have are left alone
+    plan=EditPlan.from_metadata(template,['dataIdInfo/idCitation/resTitle','dataIdInfo/idPoC/rpOrgName','Esri/scaleRange/minScale'])
+    plan.apply(md)
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.Esri.scaleRange.minScale.value==150000000
+    assert md.dataIdInfo.idPoC.is_missing
+
+
+def test_copy_missing_elements(template,md):
+    # elements and Lists the template doesn't have are left alone
+    EditPlan.from_metadata(md,['dataIdInfo/idPoC','dataIdInfo/tpCat','dataIdInfo/tpCat[0]','mdConst[0]/SecConsts']).apply(template)
+    assert not template.is_changed
+    assert template.dataIdInfo.idPoC.rpIndName.value=='Points of Contact1 Name'
+    assert len(template.dataIdInfo.tpCat)==2
+
+
+def test_element_edits(template):
+    plan=EditPlan()
+    plan.append('dataIdInfo/idCitation/citRespParty',template.dataIdInfo.idPoC)
+    plan.set('dataIdInfo/idCitation/citRespParty[0]',template.dataIdInfo.idCitation.citRespParty[1])
+    plan.delete('dataIdInfo/tpCat[0]')
+    plan.delete('dqInfo')
+    with pytest.raises(TypeError):
+        plan.append('dataIdInfo/tpCat',template.dataIdInfo.idPoC)
+    with pytest.raises(Metadata.InvalidPathError):
+        plan.append('dataIdInfo/idPoC',template.dataIdInfo.idPoC)
+
+    plan.apply(template)
+    assert [c.rpIndName.value for c in template.dataIdInfo.idCitation.citRespParty]==['Contact2 Name','Contact2 Name','Points of Contact1 Name']
+    assert [c.TopicCatCd.value.value for c in template.dataIdInfo.tpCat]==['015']
+    assert template.dqInfo.is_missing
+    assert template.changed_paths==[
+        'dataIdInfo/idCitation/citRespParty[0]',
+        'dataIdInfo/idCitation/citRespParty[2]',
+        'dataIdInfo/tpCat[0]',
+        'dqInfo',
+    ]
+
+    # list items aren't created
+    with pytest.raises(IndexError):
+        EditPlan.from_metadata(template,['dataIdInfo/tpCat[0]/TopicCatCd/value']).apply(Metadata(str(DATA_DIR/'empty.xml')))
+
+
+def test_same_values(template):
+    plan=EditPlan.from_dict({
+        'Esri/scaleRange/minScale':150000000,
+        'dataIdInfo/idCitation/resTitle':'Title',
+        'dataIdInfo/tpCat[-1]/TopicCatCd/value':'015',
+        'dataIdInfo/idCitation/citRespParty[*]/rpCntInfo/cntAddress/city':'Contact1 City',
+    })
+    plan.apply(template)
+    # the second party has no address to set
+    assert template.changed_paths==[
+        'dataIdInfo/idCitation/citRespParty[1]/rpCntInfo',
+        'dataIdInfo/idCitation/citRespParty[1]/rpCntInfo/cntAddress',
+        'dataIdInfo/idCitation/citRespParty[1]/rpCntInfo/cntAddress/city',
+    ]
+    template.changes.clear()
+    plan.apply(template)
+    assert not template.is_changed
+    EditPlan.from_dict({'dataIdInfo/tpCat[-1]/TopicCatCd/value':'001'}).apply(template)
+    assert template.changed_paths==['dataIdInfo/tpCat[1]/TopicCatCd/value']
+
+
+def test_plan_in_batch(tmpdir):
+    path=str(tmpdir.join('metadata.xml'))
+    shutil.copyfile(str(DATA_DIR/'empty.xml'),path)
+    plan=EditPlan.from_dict({'dataIdInfo/idCredit':'Credits'})
+    results=list(batch.process([path],plan,save=True,workers=0))
+    assert results[0].saved
+    assert Metadata(path).dataIdInfo.idCredit.value=='Credits'
@@ -15,6 +15,12 @@ def md(request):
 def test_missing_element(md):
     assert md.dataIdInfo.is_missing
 
-def test_add_missing_element(md):
+def test_add_missing_element(md,tmpdir):
     md.dataIdInfo.idAbs.value='Test'
     assert md.dataIdInfo.idAbs.value=='Test'
+    # the value is written to the tree, not kept on the (shared) wrapper
+    assert md.dataIdInfo.idAbs.element.text=='Test'
+    assert Metadata(str(DATA_DIR/'empty.xml')).dataIdInfo.is_missing
+    path=str(tmpdir.join('metadata.xml'))
+    md.save(path)
+    assert Metadata(path).dataIdInfo.idAbs.value=='Test'
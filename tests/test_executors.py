@@ -0,0 +1,58 @@
+import shutil
+import threading
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata
+from esri_metadata.bridge import LocalBridge
+from esri_metadata.executors import Executors,FILE,GEODATABASE
+
+pytest.importorskip('concurrent.futures')
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+DATASET='connection.sde/fc1'
+
+
+@pytest.fixture
+def executors():
+    with Executors(fileWorkers=4,geodatabaseWorkers=1) as executors:
+        yield executors
+
+@pytest.fixture
+def bridge(tmpdir):
+    b=LocalBridge(str(tmpdir.mkdir('store')),str(tmpdir.mkdir('scratch')))
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),b.store_path(DATASET))
+    return b
+
+
+# tests
+def test_load_save_file(tmpdir,executors):
+    p=str(tmpdir.join('metadata.xml'))
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),p)
+    futures=[Metadata.aload(p,executors=executors) for i in range(8)]
+    mds=[f.result() for f in futures]
+    assert all(md.dataIdInfo.idCitation.resTitle.value=='Title' for md in mds)
+    mds[0].dataIdInfo.idCitation.resTitle.value='New Title'
+    assert mds[0].asave(executors=executors).result()
+    assert not mds[1].asave(executors=executors).result()
+    assert Metadata(p).dataIdInfo.idCitation.resTitle.value=='New Title'
+    assert list(executors.executors)==[FILE]
+
+
+def test_geodatabase_pool(bridge,executors):
+    md=Metadata.aload(DATASET,bridge=bridge,executors=executors).result()
+    assert list(executors.executors)==[GEODATABASE]
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    assert md.asave(executors=executors).result()
+    assert bridge.imports==1
+
+
+def test_cancel(bridge,executors):
+    # hold the only geodatabase worker so the load is queued
+    release=threading.Event()
+    blocker=executors.submit(GEODATABASE,release.wait)
+    future=Metadata.aload(DATASET,bridge=bridge,executors=executors)
+    assert future.cancel()
+    release.set()
+    blocker.result()
+    assert future.cancelled() and bridge.exports==0
@@ -0,0 +1,140 @@
+import collections
+import csv
+import datetime
+import sys
+import types
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata,export
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+PATHS=[str(DATA_DIR/n) for n in ('full_labelled.xml','empty.xml','invalid_data.xml')]
+FIELDS=[
+    ('title','dataIdInfo/idCitation/resTitle'),
+    ('topics','dataIdInfo/tpCat[*]/TopicCatCd/value'),
+    'Esri/scaleRange/minScale',
+    'Esri/ModDate',
+]
+
+
+class ListWriter(export.ColumnWriter):
+    def start(self):
+        self.batches=[]
+
+    def write(self,columns):
+        self.batches.append([list(c) for c in columns.values])
+
+
+class FakeArrowWriter(object):
+    """Stands in for pyarrow's writers, recording what's written."""
+    def __init__(self,target,schema,**options):
+        self.target=target
+        self.schema=schema
+        self.options=options
+        self.written=[]
+        self.closed=False
+
+    def write_batch(self,batch):
+        self.written.append(batch)
+
+    def write_table(self,table):
+        self.written.append(table)
+
+    def close(self):
+        self.closed=True
+
+def fake_pyarrow():
+    """A stand in for the parts of pyarrow the writers use, types are strings and arrays (type,values) tuples."""
+    pa=types.ModuleType('pyarrow')
+    for t in ('string','int64','bool_','binary'):
+        setattr(pa,t,lambda t=t: t)
+    pa.timestamp=lambda unit: 'timestamp[{}]'.format(unit)
+    pa.list_=lambda t: 'list<{}>'.format(t)
+    pa.field=collections.namedtuple('Field','name type')
+    pa.schema=list
+    pa.array=lambda values,type: (type,list(values))
+    pa.RecordBatch=type('RecordBatch',(),{'from_arrays':staticmethod(lambda arrays,names: ('batch',names,arrays))})
+    pa.Table=type('Table',(),{'from_batches':staticmethod(lambda batches: ('table',batches))})
+    pa.RecordBatchFileWriter=FakeArrowWriter
+    pa.parquet=types.ModuleType('pyarrow.parquet')
+    pa.parquet.ParquetWriter=FakeArrowWriter
+    return pa
+
+
+# tests
+def test_export_columns():
+    errors=[]
+    writer=ListWriter(None)
+    assert export.export(PATHS,FIELDS,writer,batchSize=2,onError=lambda p,e:errors.append(p))==2
+    assert writer.names==['datasetPath','title','topics','Esri/scaleRange/minScale','Esri/ModDate']
+    # the invalid document is left out, leaving nothing to write for the second batch
+    assert writer.batches==[[PATHS[:2],['Title',None],[['008','015'],[]],[150000000,None],[datetime.datetime(2016,9,2),None]]]
+    assert errors==[PATHS[2]]
+
+
+def test_export_malformed(tmpdir):
+    path=str(tmpdir.join('malformed.xml'))
+    with open(path,'wb') as fout:
+        fout.write(b'<metadata><Esri>')
+    errors=[]
+    assert export.export([path]+PATHS[:2],FIELDS,ListWriter(None),onError=lambda p,e:errors.append(p))==2
+    assert errors==[path]
+
+
+def test_export_invalid_raises():
+    with pytest.raises(Metadata.InvalidValueError):
+        export.export(PATHS,FIELDS,ListWriter(None))
+
+
+def test_export_csv(tmpdir):
+    target=str(tmpdir.join('out.csv'))
+    with export.CsvWriter(target) as writer:
+        assert export.export(PATHS[:2],FIELDS,writer,pathColumn=None)==2
+    with open(target,'rb') as fin:
+        rows=list(csv.reader(fin))
+    assert rows==[
+        ['title','topics','Esri/scaleRange/minScale','Esri/ModDate'],
+        ['Title','008|015','150000000','2016-09-02T00:00:00'],
+        ['','','',''],
+    ]
+
+
+@pytest.mark.parametrize('writerType',['ParquetWriter','ArrowWriter'])
+def test_export_arrow(tmpdir,writerType):
+    pa=pytest.importorskip('pyarrow')
+    target=str(tmpdir.join('out'))
+    with getattr(export,writerType)(target) as writer:
+        export.export(PATHS[:2],FIELDS,writer)
+    if writerType=='ParquetWriter':
+        table=pytest.importorskip('pyarrow.parquet').read_table(target)
+    else:
+        table=pa.ipc.open_file(target).read_all()
+    assert table.column('topics').to_pylist()==[['008','015'],[]]
+    assert table.column('Esri/scaleRange/minScale').to_pylist()==[150000000,None]
+
+
+@pytest.mark.parametrize('writerType',['ParquetWriter','ArrowWriter'])
+def test_export_arrow_batches(monkeypatch,writerType):
+    # the column types and batching, without pyarrow
+    pa=fake_pyarrow()
+    monkeypatch.setitem(sys.modules,'pyarrow',pa)
+    monkeypatch.setitem(sys.modules,'pyarrow.parquet',pa.parquet)
+    writer=getattr(export,writerType)('out')
+    with writer:
+        assert export.export(PATHS[:2],FIELDS,writer,batchSize=1)==2
+        fake=writer.writer
+    assert fake.closed and writer.writer is None
+    assert [tuple(f) for f in fake.schema]==[
+        ('datasetPath','string'),
+        ('title','string'),
+        ('topics','list<string>'),
+        ('Esri/scaleRange/minScale','int64'),
+        ('Esri/ModDate','timestamp[s]'),
+    ]
+    batches=[('batch',writer.names,[('string',[PATHS[0]]),('string',['Title']),('list<string>',[['008','015']]),('int64',[150000000]),('timestamp[s]',[datetime.datetime(2016,9,2)])]),
+             ('batch',writer.names,[('string',[PATHS[1]]),('string',[None]),('list<string>',[[]]),('int64',[None]),('timestamp[s]',[None])])]
+    if writerType=='ParquetWriter':
+        assert fake.options=={'compression':'snappy'}
+        batches=[('table',[b]) for b in batches]
+    assert fake.written==batches
@@ -1,8 +1,16 @@
 import datetime
+import io
+import os
+import pickle
+import threading
 from pathlib2 import Path
 import pytest
 
 from esri_metadata import Metadata
+from esri_metadata.Metadata import Const,UMASK
+from esri_metadata.SchemaPath import SchemaPath,LruCache
+from esri_metadata.wrappers.generic import Container,Template
+from esri_metadata.wrappers.generic.values import TextStringValueContainer
 
 DATA_DIR=Path.cwd()/'tests'/'data'
 
@@ -42,6 +50,119 @@ def test_list(md):
     assert md.dataIdInfo.searchKeys[0].keyword[0].text.value=='Tags'
 
 
+def test_compiled_path(md):
+    assert md.get('dataIdInfo/idCitation/resTitle')=='Title'
+    assert md.get('dataIdInfo/idCitation/date/pubDate')==datetime.datetime(2016,9,1)
+    assert md.get('dataIdInfo/tpCat[1]/TopicCatCd/value')=='015'
+    assert md.get('dataIdInfo/idPoC/rpCntInfo/cntAddress/city') is None
+    emails=Metadata.compile_path('dataIdInfo/idCitation/citRespParty[*]/rpCntInfo/cntAddress/eMailAdd[*]')
+    assert emails(md)==['Contact1 Email']
+    assert Metadata.compile_path('dataIdInfo/tpCat[*]/TopicCatCd/value')(md)==['008','015']
+
+
+def test_read_many(md):
+    paths=[
+        'dataIdInfo/idCitation/resTitle',
+        'dataIdInfo/idCitation/date/pubDate',
+        'dataIdInfo/tpCat[*]/TopicCatCd/value',
+        'dataIdInfo/tpCat[1]/TopicCatCd/value',
+        'dataIdInfo/idPoC/rpCntInfo/cntAddress/city',
+        'dataIdInfo/idCitation/citRespParty[*]/rpCntInfo/cntAddress/eMailAdd[*]',
+        'dataIdInfo/searchKeys[*]/keyword[*]',
+    ]
+    values,errors=md.read_many(paths)
+    assert not errors
+    assert values==dict((p,md.get(p)) for p in paths)
+    assert values['dataIdInfo/idPoC/rpCntInfo/cntAddress/city'] is None
+    pathSet=Metadata.compile_paths(paths)
+    assert Metadata.compile_paths(paths) is pathSet
+    assert md.read_many(pathSet)==(values,{})
+
+
+def test_compiled_path_cache(md,monkeypatch):
+    monkeypatch.setattr(SchemaPath,'compiled',LruCache(4))
+    title=Metadata.compile_path('dataIdInfo/idCitation/resTitle')
+    for i in range(10):
+        md.get('dataIdInfo/tpCat[{}]/TopicCatCd/value'.format(i%3))
+        assert Metadata.compile_path('dataIdInfo/idCitation/resTitle') is title
+    assert len(SchemaPath.compiled)==4
+    md.get('dataIdInfo/tpCat[3]/TopicCatCd/value')
+    md.get('dataIdInfo/tpCat[4]/TopicCatCd/value')
+    assert 'dataIdInfo/idCitation/resTitle' in [p for t,p in SchemaPath.compiled.entries]
+    assert len(SchemaPath.compiled)==4
+
+
+def test_compiled_path_invalid(md):
+    with pytest.raises(Metadata.InvalidPathError): md.get('dataIdInfo/notAnElement')
+    with pytest.raises(Metadata.InvalidPathError): md.get('dataIdInfo/tpCat/TopicCatCd/value')
+    with pytest.raises(Metadata.InvalidPathError): md.get('dataIdInfo/idCitation')
+
+
+def test_load_paths(temp_path):
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),paths=['dataIdInfo/idCitation/resTitle','dataIdInfo/tpCat[*]/TopicCatCd/value'])
+    assert md.get('dataIdInfo/idCitation/resTitle')=='Title'
+    assert md.get('dataIdInfo/tpCat[*]/TopicCatCd/value')==['008','015']
+    # everything else was discarded while parsing
+    assert md.dataIdInfo.idCitation.resAltTitle.is_missing
+    assert md.dataIdInfo.idAbs.is_missing
+    assert md.Binary.is_missing
+    with pytest.raises(Metadata.ReadOnlyError): md.save(temp_path)
+
+
+def test_thumbnail(md,temp_path):
+    assert not md.binaryPayloads
+    data=md.Binary.Thumbnail.Data.value
+    # with lazyBinary the thumbnail is left in the file until it's used
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),lazyBinary=True)
+    assert md.Binary.Thumbnail.Data.element.text is None
+    assert md.Binary.Thumbnail.Data.value==data
+    data=md.Binary.Thumbnail.Data.value
+    assert data.startswith(b'\xff\xd8')
+    assert md.get('Binary/Thumbnail/Data')==data
+    buf=io.BytesIO()
+    md.write_thumbnail(buf)
+    assert buf.getvalue()==data
+
+    md.dataIdInfo.idCitation.resTitle.value='Test'
+    md.save(temp_path)
+    md.save(temp_path)
+    md=Metadata(temp_path,lazyBinary=True)
+    assert md.dataIdInfo.idCitation.resTitle.value=='Test'
+    assert md.Binary.Thumbnail.Data.value==data
+    # saving over the source file itself keeps the payload usable
+    md.dataIdInfo.idCitation.resTitle.value='Title'
+    assert md.save()
+    assert md.Binary.Thumbnail.Data.value==data
+
+    md.Binary.Thumbnail.Data.value=b'new'
+    md.save(temp_path)
+    assert Metadata(temp_path).Binary.Thumbnail.Data.value==b'new'
+
+
+def test_thumbnail_source_changed(md,tmpdir):
+    path=str(tmpdir.join('source.xml'))
+    md.save(path)
+    lazy=Metadata(path,lazyBinary=True)
+    md.dataIdInfo.idCitation.resTitle.value='A longer title'
+    md.save(path)
+    with pytest.raises(Metadata.SourceChangedError): lazy.Binary.Thumbnail.Data.value
+    with pytest.raises(Metadata.SourceChangedError): lazy.save(str(tmpdir.join('other.xml')))
+    assert not os.path.exists(str(tmpdir.join('other.xml')))
+
+
+def test_value_cache(md):
+    d=md.Esri.ModDate.value
+    assert d==datetime.datetime(2016,9,2)
+    assert md.Esri.ModDate.value is d
+    assert md.get('Esri/ModDate') is d
+    md.Esri.ModDate.value=datetime.datetime(2017,1,2)
+    assert md.Esri.ModDate.value==datetime.datetime(2017,1,2)
+    # changes made directly to the xml are picked up too
+    md.Esri.ModDate.element.text='20180304'
+    assert md.get('Esri/ModDate')==datetime.datetime(2018,3,4)
+    assert md.dataIdInfo.idCitation.date.createDate.value==datetime.datetime(2016,8,31)
+
+
 def test_separate_instances(md):
     # make sure the different contacts are fully creating children wrappers from scratch
     firstContactNameWrapper=md.dataIdInfo.idPoC.rpIndName
@@ -50,6 +171,30 @@ def test_separate_instances(md):
     assert firstContactNameWrapper.text.value=='Points of Contact1 Name'
 
 
+def test_shared_schema(md):
+    # the schema is compiled once per class and never bound itself
+    assert md.mapping is Metadata(str(DATA_DIR/'empty.xml')).mapping
+    assert md.dataIdInfo.idPoC.mapping is md.dataIdInfo.idCitation.citRespParty[0].mapping
+    assert md.dataIdInfo is not md.dataIdInfo
+    assert not md.mapping['dataIdInfo'].is_bound
+
+
+def test_concurrent_readers(md):
+    # views are never shared, so threads navigating the same document can't interfere with each other
+    expected={0:'Contact1 Name',1:'Contact2 Name'}
+    errors=[]
+    def read(i):
+        for _ in range(200):
+            poc=md.dataIdInfo.idPoC
+            contact=md.dataIdInfo.idCitation.citRespParty[i%2]
+            if contact.rpIndName.text.value!=expected[i%2] or poc.rpIndName.text.value!='Points of Contact1 Name':
+                errors.append(i)
+    threads=[threading.Thread(target=read,args=(i,)) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert errors==[]
+
+
 def test_change_value(md,temp_path):
     md.dataIdInfo.idCitation.resTitle.text.value='Test'
     assert md.dataIdInfo.idCitation.resTitle.text.value=='Test'
@@ -59,6 +204,56 @@ def test_change_value(md,temp_path):
     assert md.dataIdInfo.idCitation.resTitle.text.value=='Test'
 
 
+def test_save_mode(tmpdir,monkeypatch):
+    def umask(mask): raise AssertionError('the umask is process wide, saving must not set it')
+    monkeypatch.setattr(os,'umask',umask)
+    # the lazy thumbnail is copied in through a temporary file
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'),lazyBinary=True)
+    path=str(tmpdir.join('new.xml'))
+    md.save(path)
+    assert os.stat(path).st_mode&0o777==0o666&~UMASK
+    os.chmod(path,0o600)
+    md.save(path,force=True)
+    assert os.stat(path).st_mode&0o777==0o600
+
+
+def test_changes(md,temp_path):
+    assert not md.is_changed
+    # saving somewhere else always writes
+    assert md.save(temp_path)
+    md=Metadata(temp_path)
+    assert not md.save()
+    assert md.save(force=True)
+
+    md.dataIdInfo.idCitation.resTitle.value='Test'
+    md.dataIdInfo.tpCat[0].TopicCatCd.value.value='001'
+    del md.dataIdInfo.tpCat[1]
+    md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.value='City'
+    assert md.changed_paths==[
+        'dataIdInfo/idCitation/resTitle',
+        'dataIdInfo/idPoC/rpCntInfo',
+        'dataIdInfo/idPoC/rpCntInfo/cntAddress',
+        'dataIdInfo/idPoC/rpCntInfo/cntAddress/city',
+        'dataIdInfo/tpCat[0]/TopicCatCd/value',
+        'dataIdInfo/tpCat[1]',
+    ]
+    assert md.save()
+    assert not md.is_changed
+    assert not md.save()
+
+def test_set_same_value(md,temp_path):
+    md.save(temp_path)
+    md=Metadata(temp_path)
+    md.dataIdInfo.idCitation.resTitle.value='Title'
+    md.Esri.scaleRange.minScale.value=150000000
+    md.Esri.ModDate.value=datetime.datetime(2016,9,2)
+    md.dataIdInfo.tpCat[0].TopicCatCd.value.value='008'
+    assert not md.is_changed
+    assert not md.save()
+    md.dataIdInfo.idCitation.resTitle.value='Test'
+    assert md.changed_paths==['dataIdInfo/idCitation/resTitle']
+
+
 def test_delete_list_item(md,temp_path):
     # make sure it's there, do the delete and make sure it's gone
     assert md.dataIdInfo.tpCat[1].TopicCatCd.value.value=='015'
@@ -84,6 +279,34 @@ def test_delete_container(md,temp_path):
     assert md.dataIdInfo.idCitation.resTitle.is_missing
 
 
+def test_create_through_stale_view(md):
+    city=md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city
+    md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.value='A'
+    # city was bound before the element was created through another view
+    city.text.value='B'
+    assert len(md.childIndex.find(md.dataIdInfo.idPoC.rpCntInfo.cntAddress.element,'city'))==1
+    assert md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.value=='B'
+    other=md.dataIdInfo.idPoC.rpCntInfo.cntAddress.delPoint
+    md.dataIdInfo.idPoC.rpCntInfo.cntAddress.delPoint.value='A'
+    other.set(md.dataIdInfo.idCitation.resTitle)
+    assert md.dataIdInfo.idPoC.rpCntInfo.cntAddress.delPoint.value=='Title'
+
+
+def test_create_missing_element(md):
+    assert md.dataIdInfo.idPoC.rpCntInfo.cntAddress.is_missing
+    md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.text.value='City'
+    assert md.dataIdInfo.idPoC.rpCntInfo.cntAddress.city.text.value=='City'
+    assert len(md.dataIdInfo.idPoC.rpCntInfo.find_children(md.dataIdInfo.idPoC.element))==1
+
+
+def test_list_append_and_delete(md):
+    md.dataIdInfo.tpCat.append().TopicCatCd.value.value='010'
+    assert len(md.dataIdInfo.tpCat)==3
+    assert md.dataIdInfo.tpCat[2].TopicCatCd.value.value=='010'
+    del md.dataIdInfo.tpCat[0]
+    assert [c.TopicCatCd.value.value for c in md.dataIdInfo.tpCat]==['015','010']
+
+
 def test_append_container_to_list(md):
     md.dataIdInfo.idCitation.citRespParty.append(md.dataIdInfo.idPoC)
     assert md.dataIdInfo.idCitation.citRespParty[2].rpIndName.text.value=='Points of Contact1 Name'
@@ -103,3 +326,72 @@ def test_set_container(md,temp_path):
     # reload the file and make sure it's still gone (ie. that it was persisted)
     md=Metadata(temp_path)
     assert md.dataIdInfo.idPoC.rpIndName.text.value=='Contact2 Name'
+
+
+def test_create_attribute(md):
+    address=md.dataIdInfo.idCitation.citRespParty[0].rpCntInfo.cntAddress
+    del address.element.attrib['addressType']
+    address.addressType.create()
+    assert address.element.get('addressType')==''
+    assert md.changed_paths==['dataIdInfo/idCitation/citRespParty[0]/rpCntInfo/cntAddress/addressType']
+
+
+def test_move(md):
+    c=md.dataIdInfo.idCitation.citRespParty[1]
+    e=c.element
+    md.dataIdInfo.idPoC.set(c,move=True)
+    assert md.dataIdInfo.idPoC.element is e
+    assert len(md.dataIdInfo.idCitation.citRespParty)==1
+    md.dataIdInfo.resMaint.maintCont.append(md.dataIdInfo.idPoC,move=True)
+    assert md.dataIdInfo.idPoC.is_missing
+    assert md.dataIdInfo.resMaint.maintCont[1].rpIndName.text.value=='Contact2 Name'
+    assert 'dataIdInfo/idPoC' in md.changed_paths
+
+
+def test_move_between_documents(md):
+    other=Metadata(str(DATA_DIR/'empty.xml'))
+    other.Binary.set(md.Binary,move=True)
+    assert md.Binary.is_missing and not md.binaryPayloads
+    assert other.Binary.Thumbnail.Data.value.startswith(b'\xff\xd8')
+
+
+def test_delete_list_item_index(md):
+    md.dataIdInfo.tpCat[0].delete()
+    assert [c.TopicCatCd.value.value for c in md.dataIdInfo.tpCat]==['015']
+
+
+def test_template(md):
+    template=Template(md.dataIdInfo.idCitation.citRespParty[0])
+    template=pickle.loads(pickle.dumps(template))
+    for target in (md,Metadata(str(DATA_DIR/'empty.xml'))):
+        target.dataIdInfo.idPoC.set(template)
+        target.dataIdInfo.resMaint.maintCont.append(template)
+        assert target.dataIdInfo.idPoC.rpCntInfo.cntAddress.eMailAdd[0].text.value=='Contact1 Email'
+        assert target.dataIdInfo.resMaint.maintCont[-1].rpIndName.text.value=='Contact1 Name'
+    with pytest.raises(TypeError):
+        md.dataIdInfo.tpCat.append(template)
+
+    template=Template.from_xml('<mdConst><Consts><useLimit>Limited</useLimit></Consts></mdConst>',Const)
+    md.mdConst.append(template)
+    assert md.mdConst[-1].Consts.useLimit[0].value=='Limited'
+
+
+def test_validate(md):
+    md.dataIdInfo.tpCat[0].TopicCatCd.value.value='008'
+    md.dataIdInfo.idCitation.citRespParty[0].rpCntInfo.cntAddress.eMailAdd.append().text.value='second'
+    # the times in the file have hundredths of a second, which TextTimeValue doesn't parse
+    assert sorted(md.validate().paths)==['Esri/CreaTime','Esri/ModTime']
+
+
+class LabelledText(TextStringValueContainer):
+    def __init__(self,label):
+        super(LabelledText,self).__init__()
+        self.label=label
+
+def test_views(md):
+    for w in (md.dataIdInfo,md.dataIdInfo.tpCat,md.dataIdInfo.tpCat[0].TopicCatCd.value,md.Esri.ModDate.text):
+        assert not hasattr(w,'__dict__')
+    # subclasses without slots keep their attributes in views
+    schema=Container({'resTitle':LabelledText('Label')})
+    w=schema.mapping['resTitle'].view(md.dataIdInfo.idCitation)
+    assert (w.label,w.value)==('Label','Title')
@@ -0,0 +1,83 @@
+import datetime
+import os
+import shutil
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata,index
+from esri_metadata.bridge import LocalBridge
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+
+
+@pytest.fixture
+def xmlPaths(tmpdir):
+    paths=[]
+    for i in range(3):
+        p=str(tmpdir.join('metadata{}.xml'.format(i)))
+        shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),p)
+        paths.append(p)
+    md=Metadata(paths[1])
+    md.dataIdInfo.idPoC.rpIndName.value='Someone Else'
+    md.Esri.ModDate.value=datetime.datetime(2020,1,1)
+    while len(md.mdConst): del md.mdConst[0]
+    md.save()
+    return paths
+
+@pytest.fixture
+def idx(tmpdir):
+    with index.Index(str(tmpdir.join('index.sqlite'))) as idx:
+        yield idx
+
+
+# tests
+def test_query(xmlPaths,idx):
+    assert idx.update(xmlPaths)==3
+    assert len(idx)==3
+    assert idx.query(('topic','008'))==sorted(xmlPaths)
+    assert idx.query(('keyword','Tags'),('contact','Points of Contact1 Name'))==[xmlPaths[0],xmlPaths[2]]
+    assert idx.query(('securityClass',index.PRESENT))==[xmlPaths[0],xmlPaths[2]]
+    modified=idx.query(('modDate','>',datetime.datetime(2019,1,1)))
+    assert modified==[xmlPaths[1]]
+    assert idx.values('contact',modified)=={xmlPaths[1]:['Someone Else']}
+    assert idx.values('modDate')[xmlPaths[0]]==[datetime.datetime(2016,9,2)]
+    assert idx.query(('contact','like','Points%'))==[xmlPaths[0],xmlPaths[2]]
+    with pytest.raises(ValueError):
+        idx.query(('contact','~','x'))
+
+
+def test_incremental_update(tmpdir,xmlPaths,idx):
+    idx.update(xmlPaths)
+    assert idx.update(xmlPaths)==0
+    md=Metadata(xmlPaths[0])
+    md.dataIdInfo.idPoC.rpIndName.value='New Contact, a longer name'
+    md.save()
+    assert idx.update(xmlPaths)==1
+    assert idx.query(('contact','New Contact, a longer name'))==[xmlPaths[0]]
+    # the index is kept between sessions
+    idx.close()
+    with index.Index(idx.dbPath) as reopened:
+        assert reopened.update(xmlPaths[:2],prune=True)==0
+        assert len(reopened)==2 and xmlPaths[2] not in reopened
+    # other fields start again
+    with index.Index(idx.dbPath,fields=[('title','dataIdInfo/idCitation/resTitle')]) as other:
+        assert len(other)==0
+        other.update(xmlPaths)
+        assert other.values('title')=={p:['Title'] for p in xmlPaths}
+
+
+def test_bridge_datasets_always_read(tmpdir,idx):
+    bridge=LocalBridge(str(tmpdir.mkdir('store')),str(tmpdir.mkdir('scratch')))
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),bridge.store_path('connection.sde/fc1'))
+    assert idx.update(['connection.sde/fc1'],bridge=bridge)==1
+    assert idx.update(['connection.sde/fc1'],bridge=bridge)==1
+    assert idx.query(('fileID','FileIdentifier'))==['connection.sde/fc1']
+
+
+def test_invalid_document(tmpdir):
+    p=str(tmpdir.join('invalid.xml'))
+    shutil.copyfile(str(DATA_DIR/'invalid_data.xml'),p)
+    errors=[]
+    with index.Index(str(tmpdir.join('index.sqlite')),fields=[('minScale','Esri/scaleRange/minScale')]) as idx:
+        assert idx.update([p],onError=lambda path,e: errors.append(path))==0
+        assert errors==[p] and len(idx)==0
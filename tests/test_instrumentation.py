@@ -0,0 +1,74 @@
+import shutil
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata,instrumentation
+from esri_metadata.bridge import LocalBridge
+from esri_metadata.cache import ParseCache
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+
+
+@pytest.fixture
+def xmlPath(tmpdir):
+    p=str(tmpdir.join('metadata.xml'))
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),p)
+    return p
+
+@pytest.fixture
+def events():
+    events=[]
+    instrumentation.processStats.reset()
+    instrumentation.enable(lambda name,value,document: events.append((name,value,document)))
+    yield events
+    instrumentation.disable()
+    instrumentation.processStats.reset()
+
+
+# tests
+def test_disabled_by_default(xmlPath):
+    md=Metadata(xmlPath)
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.stats is None
+    assert not instrumentation.processStats.as_dict()
+
+
+def test_document_counts(xmlPath,events):
+    md=Metadata(xmlPath)
+    stats=md.stats.as_dict()
+    assert stats['xml_parse']==1 and stats['xml_parse_seconds']>=0
+    # wrappers are bound as they're used
+    assert 'binds' not in stats
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    assert md.dataIdInfo.idCitation.resTitle.value=='Title'
+    stats=md.stats.as_dict()
+    assert stats['binds']>0
+    assert stats['child_scans']>0
+    assert (stats['value_parses'],stats['value_cache_hits'])==(1,1)
+    # the process totals include every document
+    Metadata(xmlPath)
+    assert instrumentation.processStats.counts['xml_parse']==2
+    assert ('xml_parse',1,md) in [(n,1,d) for n,v,d in events]
+
+
+def test_save_and_caches(tmpdir,xmlPath,events):
+    cache=ParseCache(str(tmpdir.join('cache')))
+    Metadata(xmlPath,parseCache=cache,lazyBinary=True)
+    md=Metadata(xmlPath,parseCache=cache,lazyBinary=True)
+    assert md.stats.counts['parse_cache_hits']==1
+    assert instrumentation.processStats.counts['parse_cache_misses']==1
+    assert instrumentation.processStats.counts['parse_cache_bytes']>0
+    md.save(force=True)
+    # the thumbnail is copied from the source file through a temporary file
+    assert md.stats.counts['xml_write']==1
+    assert md.stats.counts['temp_bytes']>0
+
+
+def test_bridge(tmpdir,events):
+    bridge=LocalBridge(str(tmpdir.mkdir('store')),str(tmpdir.mkdir('scratch')))
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),bridge.store_path('connection.sde/fc1'))
+    md=Metadata('connection.sde/fc1',bridge=bridge)
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    md.save()
+    stats=instrumentation.processStats.as_dict()
+    assert (stats['bridge_export'],stats['bridge_import'],stats['scratch_files'])==(1,1,2)
@@ -27,3 +27,29 @@ def test_invalid_int(md):
 
 def test_invalid_single_element(md):
     with pytest.raises(Metadata.InvalidStructureError): v=md.dataIdInfo.idCredit
+
+def test_invalid_compiled_path(md):
+    with pytest.raises(Metadata.InvalidValueError): md.get('Esri/CreaDate')
+    with pytest.raises(Metadata.InvalidStructureError): md.get('dataIdInfo/idCredit')
+
+def test_read_many_errors(md):
+    values,errors=md.read_many(['Esri/CreaDate','Esri/scaleRange/minScale','dataIdInfo/idCredit','dataIdInfo/idCitation/resTitle'])
+    assert isinstance(errors['Esri/CreaDate'],Metadata.InvalidValueError)
+    assert isinstance(errors['Esri/scaleRange/minScale'],Metadata.InvalidValueError)
+    assert isinstance(errors['dataIdInfo/idCredit'],Metadata.InvalidStructureError)
+    assert values['Esri/CreaDate'] is None
+    assert values['dataIdInfo/idCitation/resTitle']==md.get('dataIdInfo/idCitation/resTitle')
+
+
+def test_validate(md):
+    report=md.validate()
+    assert not report.ok
+    problems=dict((p.path,p.kind) for p in report)
+    assert problems['Esri/CreaDate']=='value'
+    assert problems['Esri/scaleRange/minScale']=='value'
+    assert problems['dataIdInfo/idCitation/date/pubDate']=='value'
+    assert problems['dataIdInfo/idCredit']=='structure'
+    # the paths are schema paths
+    for p in report:
+        if p.kind=='value':
+            with pytest.raises(Metadata.InvalidValueError): md.get(p.path)
@@ -0,0 +1,56 @@
+import datetime
+import io
+import json
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+
+
+@pytest.fixture
+def md(request):
+    md=Metadata(str(DATA_DIR/'full_labelled.xml'))
+    # the sample document's times aren't valid TimeValues
+    del md.Esri.CreaTime
+    del md.Esri.ModTime
+    return md
+
+
+# tests
+def test_to_dict(md):
+    d=md.to_dict()
+    assert d['dataIdInfo']['idCitation']['resTitle']=='Title'
+    assert d['dataIdInfo']['idCitation']['date']['pubDate']==datetime.datetime(2016,9,1)
+    assert [c['TopicCatCd']['value'] for c in d['dataIdInfo']['tpCat']]==['008','015']
+    assert d['dataIdInfo']['idCitation']['citRespParty'][0]['rpCntInfo']['cntAddress']['eMailAdd']==['Contact1 Email']
+    assert d['Esri']['scaleRange']=={'minScale':150000000,'maxScale':5000}
+    assert d['Binary']['Thumbnail']['Data'].startswith(b'\xff\xd8')
+    # absent elements are left out
+    assert 'placeKeys' not in d['dataIdInfo']
+    assert 'Data' not in md.to_dict(skipBinary=True)['Binary']['Thumbnail']
+
+
+def test_round_trip(md,tmpdir):
+    d=md.to_dict()
+    copy=Metadata.from_dict(d,str(tmpdir.join('copy.xml')))
+    assert copy.to_dict()==d
+    copy.save()
+    assert Metadata(copy.datasetPath).to_dict()==d
+
+
+def test_json(md):
+    buf=io.BytesIO()
+    md.to_json(buf)
+    d=json.loads(buf.getvalue())
+    assert d['dataIdInfo']['idCitation']['date']['pubDate']=='2016-09-01T00:00:00'
+    assert d['Esri']['scaleRange']['minScale']==150000000
+    copy=Metadata.from_dict(d)
+    assert copy.to_dict()==md.to_dict()
+    assert copy.Binary.Thumbnail.Data.value==md.Binary.Thumbnail.Data.value
+
+
+def test_from_dict_invalid():
+    with pytest.raises(Metadata.InvalidStructureError):
+        Metadata.from_dict({'dataIdInfo':{'notInSchema':'x'}})
@@ -0,0 +1,108 @@
+import os
+import shutil
+from pathlib2 import Path
+import pytest
+
+from esri_metadata import Metadata,sync
+from esri_metadata.bridge import LocalBridge
+
+DATA_DIR=Path.cwd()/'tests'/'data'
+DATASETS=['connection.sde/fc1','connection.sde/fc2']
+
+
+def read_title(md):
+    return md.dataIdInfo.idCitation.resTitle.value
+
+def stamp(md):
+    md.dataIdInfo.idCredit.value='Stamped'
+    return read_title(md)
+
+def fail_on_second(md):
+    if md.datasetPath.endswith('1.xml'): raise KeyboardInterrupt()
+    return read_title(md)
+
+
+@pytest.fixture
+def xmlPaths(tmpdir):
+    paths=[]
+    for i in range(3):
+        p=str(tmpdir.join('metadata{}.xml'.format(i)))
+        shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),p)
+        paths.append(p)
+    return paths
+
+@pytest.fixture
+def manifest(tmpdir):
+    with sync.Manifest(str(tmpdir.join('manifest.sqlite')),useHash=True) as manifest:
+        yield manifest
+
+
+# tests
+def test_only_changed(xmlPaths,manifest):
+    results=list(manifest.sync(xmlPaths,read_title,workers=0))
+    assert sorted(r.datasetPath for r in results)==xmlPaths and all(r.ok for r in results)
+    assert len(manifest)==3
+    assert list(manifest.sync(xmlPaths,read_title,workers=0))==[]
+    # a changed file is processed again, one that's only been touched isn't
+    md=Metadata(xmlPaths[0])
+    md.dataIdInfo.idCitation.resTitle.value='New Title'
+    md.save()
+    os.utime(xmlPaths[1],(1,1))
+    assert [r.value for r in manifest.sync(xmlPaths,read_title,workers=0)]==['New Title']
+
+
+def test_saved_not_processed_again(xmlPaths,manifest):
+    results=list(manifest.sync(xmlPaths,stamp,save=True,workers=0))
+    assert all(r.saved for r in results)
+    assert Metadata(xmlPaths[0]).dataIdInfo.idCredit.value=='Stamped'
+    assert manifest.plan(xmlPaths)==[]
+
+
+def test_resume(xmlPaths,manifest):
+    with pytest.raises(KeyboardInterrupt):
+        for r in manifest.sync(xmlPaths,fail_on_second,checkpointEvery=1,workers=0): pass
+    assert manifest.pending()==xmlPaths[1:]
+    assert len(manifest)==1
+    # a new dataset isn't part of the interrupted run
+    results=list(manifest.sync(xmlPaths+[xmlPaths[0]+'.new.xml'],read_title,workers=0))
+    assert [r.datasetPath for r in results]==xmlPaths[1:]
+    assert manifest.pending()==[] and len(manifest)==3
+
+
+def test_plan_and_record(tmpdir,xmlPaths,manifest):
+    assert manifest.plan(xmlPaths)==xmlPaths
+    manifest.record(xmlPaths[:2])
+    assert manifest.plan(xmlPaths)==xmlPaths[2:]
+    assert manifest.plan(xmlPaths[:1],prune=True)==[]
+    assert len(manifest)==1
+    manifest.forget()
+    assert manifest.plan(xmlPaths)==xmlPaths
+
+
+def test_datasets_by_esri_dates(tmpdir):
+    bridge=LocalBridge(str(tmpdir.mkdir('store')),str(tmpdir.mkdir('scratch')))
+    for d in DATASETS:
+        shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),bridge.store_path(d))
+    with sync.Manifest(str(tmpdir.join('manifest.sqlite')),bridge=bridge) as manifest:
+        assert manifest.plan(DATASETS)==DATASETS
+        manifest.record(DATASETS)
+        assert manifest.plan(DATASETS)==[]
+        md=Metadata(DATASETS[1],bridge=bridge)
+        md.Esri.ModDate.value=md.Esri.ModDate.value.replace(year=2020)
+        md.save()
+        assert manifest.plan(DATASETS)==DATASETS[1:]
+
+
+def test_unreadable_dataset(tmpdir,monkeypatch):
+    bridge=LocalBridge(str(tmpdir.mkdir('store')),str(tmpdir.mkdir('scratch')))
+    monkeypatch.setattr(Metadata,'defaultBridge',bridge)
+    shutil.copyfile(str(DATA_DIR/'full_labelled.xml'),bridge.store_path(DATASETS[0]))
+    with open(bridge.store_path(DATASETS[1]),'w') as f: f.write('<metadata>')
+    with sync.Manifest(str(tmpdir.join('manifest.sqlite')),bridge=bridge) as manifest:
+        # reported as a Result
+        results=list(manifest.sync(DATASETS,read_title,workers=0))
+        assert [(r.datasetPath,r.ok) for r in results]==[(DATASETS[1],False),(DATASETS[0],True)]
+        assert isinstance(results[0].error,SyntaxError)
+        # and found again by the next run
+        assert manifest.plan(DATASETS)==[]
+        assert list(manifest.errors)==DATASETS[1:]